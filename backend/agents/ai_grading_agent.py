@@ -3,8 +3,8 @@ AI-Powered Resume Grading Agent
 Uses Google Gemini to provide intelligent, context-aware resume grading
 """
 
-from typing import Dict, List
-from ai_client import get_ai_client
+from typing import Dict, List, Tuple
+from ai_client import get_ai_client, get_async_ai_client
 
 
 class AIGradingAgent:
@@ -13,6 +13,28 @@ class AIGradingAgent:
     Replaces rule-based scoring with intelligent context understanding.
     """
     
+    # Expected schema of the AI grading response
+    GRADING_SCHEMA = {
+        "overall_score": "number (0-100)",
+        "letter_grade": "string (A+ to F)",
+        "grade_description": "string",
+        "market_tier": "string",
+        "component_scores": {
+            "technical_depth": "number (0-100)",
+            "project_quality": "number (0-100)",
+            "capability_strength": "number (0-100)",
+            "experience_quality": "number (0-100)",
+            "completeness": "number (0-100)",
+            "competitiveness": "number (0-100)"
+        },
+        "strengths": ["string"],
+        "weaknesses": ["string"],
+        "improvement_areas": ["string"],
+        "competitive_position": "string",
+        "percentile_rank": "string",
+        "justification": "string (why this grade?)"
+    }
+    
     def __init__(self, resume_text: str, detected_skills: List[str], 
                  project_analysis: Dict, capability_analysis: Dict):
         self.resume_text = resume_text
@@ -20,6 +42,7 @@ class AIGradingAgent:
         self.project_analysis = project_analysis
         self.capability_analysis = capability_analysis
         self.ai_client = get_ai_client()
+        self.ai_graded = False  # True only when Gemini's grade was accepted
     
     def calculate_grade(self) -> Dict:
         """
@@ -30,35 +53,27 @@ class AIGradingAgent:
             print("⚠️  AI not available, using rule-based grading")
             return self._fallback_grading()
         
-        # Build AI prompt
-        prompt = self._build_grading_prompt()
-        
-        # Define expected schema
-        schema = {
-            "overall_score": "number (0-100)",
-            "letter_grade": "string (A+ to F)",
-            "grade_description": "string",
-            "market_tier": "string",
-            "component_scores": {
-                "technical_depth": "number (0-100)",
-                "project_quality": "number (0-100)",
-                "capability_strength": "number (0-100)",
-                "experience_quality": "number (0-100)",
-                "completeness": "number (0-100)",
-                "competitiveness": "number (0-100)"
-            },
-            "strengths": ["string"],
-            "weaknesses": ["string"],
-            "improvement_areas": ["string"],
-            "competitive_position": "string",
-            "percentile_rank": "string",
-            "justification": "string (why this grade?)"
-        }
-        
         # Get AI analysis
-        result = self.ai_client.analyze_with_structured_output(prompt, schema)
+        result = self.ai_client.analyze_with_structured_output(self._build_grading_prompt(), self.GRADING_SCHEMA)
+        return self._accept(result)
+    
+    async def calculate_grade_async(self) -> Dict:
+        """
+        Same as calculate_grade, but awaits the Gemini call on the asyncio client
+        instead of blocking a thread for the whole round trip.
+        """
+        if not self.ai_client.is_available():
+            print("⚠️  AI not available, using rule-based grading")
+            return self._fallback_grading()
         
+        result = await get_async_ai_client().analyze_with_structured_output(
+            self._build_grading_prompt(), self.GRADING_SCHEMA
+        )
+        return self._accept(result)
+    
+    def _accept(self, result) -> Dict:
         if result:
+            self.ai_graded = True
             print(f"✅ AI Grading: {result.get('letter_grade', 'N/A')} ({result.get('overall_score', 0)}/100)")
             return result
         else:
@@ -192,3 +207,25 @@ def grade_resume_with_ai(resume_text: str, detected_skills: List[str],
     result = agent.calculate_grade()
     result['ai_powered'] = agent.ai_client.is_available()
     return result
+
+
+async def grade_resume_with_ai_async(resume_text: str, detected_skills: List[str],
+                                     project_analysis: Dict, capability_analysis: Dict) -> Dict:
+    """Async variant of grade_resume_with_ai for the event loop"""
+    result, _ = await grade_resume_with_ai_checked_async(
+        resume_text, detected_skills, project_analysis, capability_analysis
+    )
+    return result
+
+
+async def grade_resume_with_ai_checked_async(resume_text: str, detected_skills: List[str],
+                                             project_analysis: Dict, capability_analysis: Dict) -> Tuple[Dict, bool]:
+    """
+    Returns:
+        (grade, ai_graded) where ai_graded is False whenever the rule-based
+        fallback produced the grade (AI unavailable, call failed, rate limited)
+    """
+    agent = AIGradingAgent(resume_text, detected_skills, project_analysis, capability_analysis)
+    result = await agent.calculate_grade_async()
+    result['ai_powered'] = agent.ai_client.is_available()
+    return result, agent.ai_graded
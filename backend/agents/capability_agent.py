@@ -3,7 +3,7 @@ Advanced Capability Assessment Agent
 Multi-dimensional skill depth analysis based on evidence, not just frequency.
 """
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 
 class CapabilityScorer:
@@ -31,6 +31,7 @@ class CapabilityScorer:
         self.skill_frequency = skill_frequency
         self.tech_to_projects = project_analysis.get('tech_to_projects', {})
         self.tech_max_complexity = project_analysis.get('tech_max_complexity', {})
+        self.skill_evidence = project_analysis.get('skill_evidence', {})
         
     def assess_all_capabilities(self) -> Dict:
         """Calculate capability scores for all detected skills."""
@@ -117,22 +118,12 @@ class CapabilityScorer:
     
     def _calculate_role_score(self, skill: str) -> float:
         """Analyze how the skill was used (primary tech, supporting, mentioned)."""
-        # Check if skill appears in high-quality projects
-        detailed_projects = self.project_analysis.get('detailed_projects', [])
-        
-        primary_tech_count = 0
-        supporting_tech_count = 0
-        
-        for project in detailed_projects:
-            if skill in project.get('technologies', []):
-                # If it's in title or early in description → primary
-                title = project.get('title', '').lower()
-                desc = project.get('description', '').lower()
-                
-                if skill.lower() in title or desc.find(skill.lower()) < 100:
-                    primary_tech_count += 1
-                else:
-                    supporting_tech_count += 1
+        # Every project using the skill, with its role there, from ProjectAnalyzer's index
+        uses = self.skill_evidence.get(skill, [])
+        
+        # In the title or early in the description → primary
+        primary_tech_count = sum(1 for use in uses if use['primary'])
+        supporting_tech_count = len(uses) - primary_tech_count
         
         # Score: Primary tech = higher score
         score = (primary_tech_count * 3) + (supporting_tech_count * 1)
@@ -140,13 +131,8 @@ class CapabilityScorer:
     
     def _get_role_context(self, skill: str) -> str:
         """Determine if skill was used as primary tech, supporting, or mentioned."""
-        detailed_projects = self.project_analysis.get('detailed_projects', [])
-        
-        for project in detailed_projects:
-            if skill in project.get('technologies', []):
-                title = project.get('title', '').lower()
-                if skill.lower() in title:
-                    return 'Primary Technology'
+        if any(use['in_title'] for use in self.skill_evidence.get(skill, [])):
+            return 'Primary Technology'
         
         if len(self.tech_to_projects.get(skill, [])) > 2:
             return 'Core Technology'
@@ -211,3 +197,196 @@ def assess_capabilities(project_analysis: Dict, skill_frequency: Dict) -> Dict:
     """Main function for capability assessment."""
     scorer = CapabilityScorer(project_analysis, skill_frequency)
     return scorer.assess_all_capabilities()
+
+
+# =================================
+# BATCH ENGINE (NumPy, imported on first batch)
+# =================================
+class CapabilityColumns:
+    """
+    The four capability factors of one resume or a whole batch, stored column-wise:
+    one row per (resume, skill), each resume a contiguous run of rows. Scores,
+    levels, confidence and overall strength are computed with array ops; the
+    verbose per-skill evidence dicts are only built by evidence().
+    """
+    
+    LEVELS = ('NOVICE', 'BEGINNER', 'INTERMEDIATE', 'ADVANCED', 'EXPERT')
+    CONFIDENCE = ('LOW', 'MEDIUM', 'HIGH')
+    
+    def __init__(self, batch: List[Tuple[Dict, Dict]]):
+        """
+        Args:
+            batch: List of (project_analysis, skill_frequency) pairs
+        """
+        import numpy as np
+        self.batch = batch
+        self.skills: List[str] = []
+        self.offsets = [0]  # resume i owns rows offsets[i]:offsets[i + 1]
+        
+        mentions, project_counts, max_complexity, primary, supporting, in_title = [], [], [], [], [], []
+        for project_analysis, skill_frequency in batch:
+            tech_to_projects = project_analysis.get('tech_to_projects', {})
+            tech_max_complexity = project_analysis.get('tech_max_complexity', {})
+            skill_evidence = project_analysis.get('skill_evidence', {})
+            for skill, count in skill_frequency.items():
+                uses = skill_evidence.get(skill, [])
+                primary_count = sum(1 for use in uses if use['primary'])
+                self.skills.append(skill)
+                mentions.append(count)
+                project_counts.append(len(tech_to_projects.get(skill, [])))
+                max_complexity.append(tech_max_complexity.get(skill, 0))
+                primary.append(primary_count)
+                supporting.append(len(uses) - primary_count)
+                in_title.append(any(use['in_title'] for use in uses))
+            self.offsets.append(len(self.skills))
+        
+        self.mentions = np.array(mentions, dtype=np.int64)
+        self.project_counts = np.array(project_counts, dtype=np.int64)
+        self.max_complexity = np.array(max_complexity, dtype=np.float64)
+        self.primary = np.array(primary, dtype=np.int64)
+        self.supporting = np.array(supporting, dtype=np.int64)
+        self.in_title = np.array(in_title, dtype=bool)
+    
+    def score(self):
+        """
+        Returns:
+            mention, project, complexity, role: (rows,) factor scores
+            capability: (rows,) unrounded weighted score
+        """
+        import numpy as np
+        mention = np.minimum(self.mentions * 2, 10).astype(np.float64)
+        project = np.minimum(self.project_counts * 2.5, 10)
+        # Detected but in no project: assume moderate complexity, as the scalar scorer does
+        complexity = np.where(self.max_complexity == 0, 5.0, self.max_complexity)
+        role = np.minimum(self.primary * 3 + self.supporting, 10).astype(np.float64)
+        # Same operation order as CapabilityScorer, so every row is bit-identical
+        capability = mention * 0.05 + project * 0.20 + complexity * 0.50 + role * 0.25
+        return mention, project, complexity, role, capability
+    
+    @staticmethod
+    def round1(values):
+        """round(x, 1) for an array, matching Python's correctly rounded result."""
+        import numpy as np
+        rounded = np.round(values, 1)
+        # rint(x * 10) can land on the other side of a tie than Python's round(); redo those rows
+        tenths = values * 10
+        ties = np.flatnonzero(np.abs(tenths - np.floor(tenths) - 0.5) < 1e-9)
+        for row in ties.tolist():
+            rounded[row] = round(float(values[row]), 1)
+        return rounded
+    
+    def levels(self, capability):
+        """Level index into LEVELS from the unrounded score."""
+        import numpy as np
+        return np.searchsorted(np.array([3, 5, 7, 9], dtype=np.float64), capability, side='right')
+    
+    def confidence(self):
+        """Confidence index into CONFIDENCE."""
+        import numpy as np
+        high = (self.project_counts >= 3) & (self.mentions >= 5)
+        medium = (self.project_counts >= 2) | (self.mentions >= 3)
+        return np.where(high, 2, np.where(medium, 1, 0))
+    
+    def overall_strength(self, rounded, levels) -> List[float]:
+        """_calculate_overall_strength per resume, from the rounded scores."""
+        import numpy as np
+        weights = np.where(levels == 4, 1.5, np.where(levels == 3, 1.2, 1.0))
+        weighted = rounded * weights
+        overall = []
+        for start, stop in zip(self.offsets, self.offsets[1:]):
+            if start == stop:
+                overall.append(0)
+                continue
+            # cumsum adds left to right like the scalar loop (sum() is pairwise)
+            total = np.cumsum(weighted[start:stop])[-1]
+            total_weight = np.cumsum(weights[start:stop])[-1]
+            overall.append(round(float(total / total_weight), 1))
+        return overall
+    
+    def evidence(self, resume: int, row: int) -> Dict:
+        """The evidence dict of one row, built on demand."""
+        project_analysis, skill_frequency = self.batch[resume]
+        skill = self.skills[row]
+        projects = project_analysis.get('tech_to_projects', {}).get(skill, [])
+        project_count = len(projects)
+        if self.in_title[row]:
+            role_context = 'Primary Technology'
+        elif project_count > 2:
+            role_context = 'Core Technology'
+        elif project_count > 0:
+            role_context = 'Supporting Technology'
+        else:
+            role_context = 'Mentioned'
+        return {
+            'mentions': skill_frequency.get(skill, 0),
+            'project_count': project_count,
+            'projects': projects[:3],  # Top 3
+            'max_complexity': project_analysis.get('tech_max_complexity', {}).get(skill, 0),
+            'role_context': role_context
+        }
+
+
+def assess_capabilities_batch(batch: List[Tuple[Dict, Dict]], include_evidence: bool = False) -> List[Dict]:
+    """
+    Assess many resumes at once; with include_evidence, output matches
+    assess_capabilities() item by item. Without it, the per-skill 'evidence'
+    dicts are left out.
+    
+    Args:
+        batch: List of (project_analysis, skill_frequency) pairs
+        include_evidence: Build the per-skill evidence dicts
+    
+    Returns:
+        List of capability reports in input order
+    """
+    if not batch:
+        return []
+    
+    columns = CapabilityColumns(batch)
+    mention, project, complexity, role, capability = columns.score()
+    levels = columns.levels(capability)
+    confidence = columns.confidence()
+    rounded = columns.round1(capability)
+    overall = columns.overall_strength(rounded, levels)
+    
+    rounded = rounded.tolist()
+    mention, project, role = mention.tolist(), project.tolist(), role.tolist()
+    complexity = columns.round1(complexity).tolist()
+    levels, confidence = levels.tolist(), confidence.tolist()
+    
+    reports = []
+    for resume, (start, stop) in enumerate(zip(columns.offsets, columns.offsets[1:])):
+        capability_scores = {}
+        for row in range(start, stop):
+            data = {
+                'capability_score': rounded[row],
+                'capability_level': CapabilityColumns.LEVELS[levels[row]],
+                'mention_score': mention[row],
+                'project_score': project[row],
+                'complexity_score': complexity[row],
+                'role_score': role[row],
+                'confidence': CapabilityColumns.CONFIDENCE[confidence[row]]
+            }
+            if include_evidence:
+                data['evidence'] = columns.evidence(resume, row)
+            capability_scores[columns.skills[row]] = data
+        
+        top_capabilities = sorted(
+            capability_scores.items(),
+            key=lambda x: x[1]['capability_score'],
+            reverse=True
+        )[:10]
+        
+        reports.append({
+            'detailed_capabilities': capability_scores,
+            'top_capabilities': dict(top_capabilities),
+            'expert_skills': [s for s, data in capability_scores.items()
+                              if data['capability_level'] == 'EXPERT'],
+            'advanced_skills': [s for s, data in capability_scores.items()
+                                if data['capability_level'] in ['ADVANCED', 'EXPERT']],
+            'developing_skills': [s for s, data in capability_scores.items()
+                                  if data['capability_level'] in ['BEGINNER', 'INTERMEDIATE']],
+            'overall_capability_strength': overall[resume]
+        })
+    
+    return reports
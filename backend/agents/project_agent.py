@@ -4,8 +4,71 @@ Evaluates projects across 12+ dimensions for accurate capability assessment.
 """
 
 import re
-from typing import Dict, List
-from skills import SKILLS_LIST
+from typing import Dict, List, Union
+from resume_document import ResumeDocument, as_document
+from skill_matcher import PhraseMatcher
+
+
+class IndicatorScorer:
+    """
+    Compiles weighted indicator groups into one PhraseMatcher plus one metrics regex,
+    so a project is scanned once for every group. Phrases match as substrings, like
+    the `indicator in text` checks they replace, so inflections count: "teams",
+    "two awards", "integration tests".
+    """
+    
+    def __init__(self, groups: Dict[str, Dict[str, float]], metric_patterns: Dict[str, str], metric_weight: float):
+        """
+        Args:
+            groups: Group name -> {indicator phrase: weight}
+            metric_patterns: Metric name -> regex over lowercase text
+            metric_weight: Weight of each metric found
+        """
+        self.groups = list(groups)
+        self._phrase_groups: Dict[str, List[tuple]] = {}
+        for group, indicators in groups.items():
+            for indicator, weight in indicators.items():
+                self._phrase_groups.setdefault(indicator.lower(), []).append((group, weight))
+        self.matcher = PhraseMatcher(self._phrase_groups, bounded=False)
+        
+        # Lookahead keeps overlapping metrics ("$10k users" is money AND users);
+        # (?<!\d) pins each number to its first digit so it is reported once
+        self.metric_weight = metric_weight
+        self.metric_regex = re.compile('(?=' + '|'.join(
+            f'(?P<{name}>(?<!\\d){pattern})' for name, pattern in metric_patterns.items()
+        ) + ')')
+    
+    def scan(self, text: str) -> Dict[str, Dict[str, Dict]]:
+        """
+        Find every indicator in one pass.
+        
+        Returns:
+            Group name -> {indicator: {'weight': w, 'positions': [start, ...]}},
+            with metric hits under the 'metrics' group.
+        """
+        hits = {group: {} for group in self.groups}
+        hits['metrics'] = {}
+        
+        for phrase, start, _ in self.matcher.find_all(text):
+            for group, weight in self._phrase_groups[phrase]:
+                entry = hits[group].setdefault(phrase, {'weight': weight, 'positions': []})
+                entry['positions'].append(start)
+        
+        for match in self.metric_regex.finditer(text):
+            name = match.lastgroup
+            entry = hits['metrics'].setdefault(name, {'weight': self.metric_weight, 'positions': []})
+            entry['positions'].append(match.start())
+        
+        return hits
+    
+    def scan_many(self, texts: List[str]) -> List[Dict[str, Dict[str, Dict]]]:
+        """Scan a batch of project texts."""
+        return [self.scan(text) for text in texts]
+    
+    @staticmethod
+    def score(hits: Dict[str, Dict[str, Dict]], group: str) -> float:
+        """Sum of weights of the distinct indicators found in a group."""
+        return sum(entry['weight'] for entry in hits.get(group, {}).values())
 
 
 class ProjectAnalyzer:
@@ -67,14 +130,37 @@ class ProjectAnalyzer:
         'developed': 4, 'implemented': 5
     }
     
-    def __init__(self, projects: List[Dict], all_text: str):
+    # Context keywords (presence only)
+    TEAM_KEYWORDS = ['team', 'collaborated', 'group']
+    RECENCY_KEYWORDS = ['2022', '2023', '2024', '2025', '2026', 'current', 'present', 'ongoing']
+    SCOPE_KEYWORDS = {
+        'Production/Enterprise': ['enterprise', 'production', 'deployed', '1000+ users'],
+        'Prototype/MVP': ['prototype', 'poc', 'proof of concept', 'mvp'],
+        'Learning Project': ['learning', 'tutorial', 'practice', 'course']
+    }
+    
+    # Quantified impact (users, revenue, metrics); each pattern found adds METRIC_WEIGHT
+    NUMBER_PATTERNS = {
+        'users': r'(\d+k|\d+,\d+)\s*users',
+        'percent': r'(\d+)%\s*(?:improvement|increase|reduction)',
+        'money': r'\$(\d+k|\d+m)',
+        'companies': r'(\d+)\s*companies'
+    }
+    METRIC_WEIGHT = 8
+    
+    # A technology named in the title or this early in the description is a primary one
+    PRIMARY_TECH_POSITION = 100
+    
+    def __init__(self, projects: List[Dict], all_text: Union[str, ResumeDocument]):
         """
         Args:
             projects: List of project dicts from section_extractor
-            all_text: Full resume text for context
+            all_text: Full resume text (or the shared ResumeDocument) for context
         """
         self.projects = projects
-        self.all_text = all_text.lower()
+        self.document = as_document(all_text)
+        self.all_text = self.document.lower
+        self.taxonomy = self.document.taxonomy
         
     def analyze_all_projects(self) -> Dict:
         """Comprehensive analysis of all projects."""
@@ -94,23 +180,27 @@ class ProjectAnalyzer:
         desc = project.get('description', '')
         combined = f"{title} {desc}".lower()
         
+        # 4. Technology extraction (first: complexity bonus depends on it)
+        technologies = self._extract_technologies(combined, project.get('span'))
+        skill_evidence = self._locate_technologies(title, desc, technologies)
+        
+        # Every indicator group in one scan
+        signals = INDICATOR_SCORER.scan(combined)
+        
         # 1. Complexity scoring (1-10)
-        complexity = self._calculate_complexity(combined)
+        complexity = self._calculate_complexity(signals, len(technologies))
         
         # 2. Impact detection
-        impact_score = self._calculate_impact(combined)
+        impact_score = self._calculate_impact(signals)
         
         # 3. Role identification
-        role_type, role_score = self._identify_role(combined)
-        
-        # 4. Technology extraction and depth
-        technologies = self._extract_technologies(combined)
+        role_type, role_score = self._identify_role(signals)
         
         # 5. Recency indicators
-        is_recent = self._detect_recency(combined)
+        is_recent = self._detect_recency(signals)
         
         # 6. Scope detection
-        scope = self._detect_scope(combined)
+        scope = self._detect_scope(signals)
         
         return {
             'title': title,
@@ -122,25 +212,20 @@ class ProjectAnalyzer:
             'technologies': technologies,
             'is_recent': is_recent,
             'scope': scope,
-            'overall_quality': self._calculate_quality(complexity, impact_score, role_score)
+            'overall_quality': self._calculate_quality(complexity, impact_score, role_score),
+            'skill_evidence': skill_evidence,  # folded into the skill index by _aggregate_analysis
+            'domain_hits': self.taxonomy.domain_hits(technologies)  # matching skills per domain, for _calculate_domain_scores
         }
     
-    def _calculate_complexity(self, text: str) -> float:
+    def _calculate_complexity(self, signals: Dict, tech_count: int) -> float:
         """Calculate project complexity on 1-10 scale."""
-        score = 0
-        matched_indicators = []
-        
-        for indicator, weight in self.COMPLEXITY_INDICATORS.items():
-            if indicator in text:
-                score += weight
-                matched_indicators.append(indicator)
+        score = IndicatorScorer.score(signals, 'complexity')
         
         # Normalize to 1-10 scale
         # Max realistic score ~50-60 for very complex project
         normalized = min(10, (score / 5) + 1)
         
         # Bonus for multiple tech stacks
-        tech_count = len(self._extract_technologies(text))
         if tech_count > 5:
             normalized = min(10, normalized + 1)
         if tech_count > 10:
@@ -148,44 +233,22 @@ class ProjectAnalyzer:
         
         return round(normalized, 1)
     
-    def _calculate_impact(self, text: str) -> float:
+    def _calculate_impact(self, signals: Dict) -> float:
         """Calculate project impact on 1-10 scale."""
-        score = 0
-        
-        for indicator, weight in self.IMPACT_INDICATORS.items():
-            if indicator in text:
-                score += weight
-        
-        # Check for numbers (users, revenue, metrics)
-        number_patterns = [
-            r'(\d+k|\d+,\d+)\s*users',
-            r'(\d+)%\s*(?:improvement|increase|reduction)',
-            r'\$(\d+k|\d+m)',
-            r'(\d+)\s*companies'
-        ]
+        score = IndicatorScorer.score(signals, 'impact')
         
-        for pattern in number_patterns:
-            if re.search(pattern, text):
-                score += 8
+        # Numbers (users, revenue, metrics)
+        score += IndicatorScorer.score(signals, 'metrics')
         
         # Normalize to 1-10
         normalized = min(10, (score / 4) + 1)
         return round(normalized, 1)
     
-    def _identify_role(self, text: str) -> tuple:
+    def _identify_role(self, signals: Dict) -> tuple:
         """Identify user's role: Leader, Contributor, Solo."""
-        leadership_score = sum(
-            weight for indicator, weight in self.LEADERSHIP_INDICATORS.items()
-            if indicator in text
-        )
-        
-        solo_score = sum(
-            weight for indicator, weight in self.SOLO_INDICATORS.items()
-            if indicator in text
-        )
-        
-        team_keywords = ['team', 'collaborated', 'group']
-        has_team = any(kw in text for kw in team_keywords)
+        leadership_score = IndicatorScorer.score(signals, 'leadership')
+        solo_score = IndicatorScorer.score(signals, 'solo')
+        has_team = bool(signals['team'])
         
         if leadership_score > 15:
             return 'Tech Lead', leadership_score
@@ -198,29 +261,44 @@ class ProjectAnalyzer:
         else:
             return 'Developer', 4
     
-    def _extract_technologies(self, text: str) -> List[str]:
+    def _extract_technologies(self, text: str, span=None) -> List[str]:
         """Extract all technologies mentioned in project."""
-        found = []
-        for skill in SKILLS_LIST:
-            if skill.lower() in text:
-                found.append(skill)
-        return found
+        if span:
+            return self.document.skills_in_span(*span)
+        return list(dict.fromkeys(skill for skill, _, _ in self.taxonomy.matcher.find_all(text)))
     
-    def _detect_recency(self, text: str) -> bool:
+    def _locate_technologies(self, title: str, desc: str, technologies: List[str]) -> Dict[str, Dict]:
+        """
+        Where each technology shows up in a project: named in the title, and the
+        offset of its first mention in the description (None if only elsewhere).
+        One matcher scan of each text, whatever the number of technologies.
+        """
+        in_title = {skill for skill, _, _ in self.taxonomy.matcher.find_all(title)}
+        first_position = {}
+        for skill, start, _ in self.taxonomy.matcher.find_all(desc):
+            if skill not in first_position or start < first_position[skill]:
+                first_position[skill] = start
+        
+        evidence = {}
+        for tech in technologies:
+            position = first_position.get(tech)
+            evidence[tech] = {
+                'first_position': position,
+                'in_title': tech in in_title,
+                'primary': tech in in_title or (position is not None and position < self.PRIMARY_TECH_POSITION)
+            }
+        return evidence
+    
+    def _detect_recency(self, signals: Dict) -> bool:
         """Detect if project is recent (2022-2026)."""
-        recent_years = ['2022', '2023', '2024', '2025', '2026', 'current', 'present', 'ongoing']
-        return any(year in text for year in recent_years)
+        return bool(signals['recency'])
     
-    def _detect_scope(self, text: str) -> str:
+    def _detect_scope(self, signals: Dict) -> str:
         """Detect project scope: Enterprise, Production, POC, Learning."""
-        if any(kw in text for kw in ['enterprise', 'production', 'deployed', '1000+ users']):
-            return 'Production/Enterprise'
-        elif any(kw in text for kw in ['prototype', 'poc', 'proof of concept', 'mvp']):
-            return 'Prototype/MVP'
-        elif any(kw in text for kw in ['learning', 'tutorial', 'practice', 'course']):
-            return 'Learning Project'
-        else:
-            return 'Standard Development'
+        for scope in self.SCOPE_KEYWORDS:
+            if signals[scope]:
+                return scope
+        return 'Standard Development'
     
     def _calculate_quality(self, complexity: float, impact: float, role_score: float) -> float:
         """Calculate overall project quality score."""
@@ -244,8 +322,13 @@ class ProjectAnalyzer:
         tech_frequency = {}
         tech_to_projects = {}
         tech_max_complexity = {}
+        # Skill -> every project using it (not just the displayed top 5), with its role there
+        skill_evidence = {}
+        project_domain_hits = []
         
         for project in analyzed_projects:
+            evidence = project.pop('skill_evidence')
+            project_domain_hits.append(project.pop('domain_hits'))
             for tech in project['technologies']:
                 tech_frequency[tech] = tech_frequency.get(tech, 0) + 1
                 
@@ -255,9 +338,11 @@ class ProjectAnalyzer:
                 
                 current_max = tech_max_complexity.get(tech, 0)
                 tech_max_complexity[tech] = max(current_max, project['complexity_score'])
+                
+                skill_evidence.setdefault(tech, []).append({'title': project['title'], **evidence[tech]})
         
         # Determine strongest project domain
-        domain_scores = self._calculate_domain_scores(analyzed_projects)
+        domain_scores = self._calculate_domain_scores(analyzed_projects, project_domain_hits)
         strongest_domain = max(domain_scores, key=domain_scores.get) if domain_scores else 'General'
         
         # Leadership experience
@@ -274,6 +359,7 @@ class ProjectAnalyzer:
             'tech_frequency': tech_frequency,
             'tech_to_projects': tech_to_projects,
             'tech_max_complexity': tech_max_complexity,
+            'skill_evidence': skill_evidence,
             'leadership_experience': len(leadership_projects) > 0,
             'leadership_project_count': len(leadership_projects),
             'recent_projects': sum(1 for p in analyzed_projects if p['is_recent']),
@@ -281,22 +367,18 @@ class ProjectAnalyzer:
             'project_quality_distribution': self._get_quality_distribution(analyzed_projects)
         }
     
-    def _calculate_domain_scores(self, projects: List[Dict]) -> Dict[str, float]:
-        """Calculate domain strength based on projects."""
-        from domain_map import DOMAIN_MAP
-        
-        domain_scores = {}
-        
-        for domain, skills in DOMAIN_MAP.items():
-            score = 0
-            for project in projects:
-                project_domain_skills = set(project['technologies']) & set(skills)
-                if project_domain_skills:
+    def _calculate_domain_scores(self, projects: List[Dict], project_domain_hits: List[List[int]]) -> Dict[str, float]:
+        """Calculate domain strength based on projects, in one pass over their domain hits."""
+        domain_names = self.taxonomy.domain_names
+        scores = [0] * len(domain_names)
+        
+        for project, hits in zip(projects, project_domain_hits):
+            for domain, count in enumerate(hits):
+                if count:
                     # Weight by project quality and number of matching skills
-                    score += project['overall_quality'] * len(project_domain_skills)
-            domain_scores[domain] = round(score, 1)
+                    scores[domain] += project['overall_quality'] * count
         
-        return domain_scores
+        return {domain: round(score, 1) for domain, score in zip(domain_names, scores)}
     
     def _get_quality_distribution(self, projects: List[Dict]) -> Dict:
         """Get distribution of project quality."""
@@ -325,6 +407,7 @@ class ProjectAnalyzer:
             'tech_frequency': {},
             'tech_to_projects': {},
             'tech_max_complexity': {},
+            'skill_evidence': {},
             'leadership_experience': False,
             'leadership_project_count': 0,
             'recent_projects': 0,
@@ -333,7 +416,23 @@ class ProjectAnalyzer:
         }
 
 
-def analyze_projects(projects: List[Dict], full_resume_text: str) -> Dict:
+# Compiled once from ProjectAnalyzer's dictionaries; shared by every analysis
+INDICATOR_SCORER = IndicatorScorer(
+    groups={
+        'complexity': ProjectAnalyzer.COMPLEXITY_INDICATORS,
+        'impact': ProjectAnalyzer.IMPACT_INDICATORS,
+        'leadership': ProjectAnalyzer.LEADERSHIP_INDICATORS,
+        'solo': ProjectAnalyzer.SOLO_INDICATORS,
+        'team': dict.fromkeys(ProjectAnalyzer.TEAM_KEYWORDS, 1),
+        'recency': dict.fromkeys(ProjectAnalyzer.RECENCY_KEYWORDS, 1),
+        **{scope: dict.fromkeys(keywords, 1) for scope, keywords in ProjectAnalyzer.SCOPE_KEYWORDS.items()}
+    },
+    metric_patterns=ProjectAnalyzer.NUMBER_PATTERNS,
+    metric_weight=ProjectAnalyzer.METRIC_WEIGHT
+)
+
+
+def analyze_projects(projects: List[Dict], full_resume_text: Union[str, ResumeDocument]) -> Dict:
     """Main function to analyze all projects."""
     analyzer = ProjectAnalyzer(projects, full_resume_text)
     return analyzer.analyze_all_projects()
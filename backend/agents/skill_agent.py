@@ -1,9 +1,9 @@
-from agents.risk_agent import SKILL_WEIGHTS
+from taxonomy import get_taxonomy
 
-def skill_importance(missing):
+def skill_importance(missing, taxonomy=None):
     return sorted(
         missing,
-        key=lambda x: SKILL_WEIGHTS.get(x, 5),
+        key=(taxonomy or get_taxonomy()).weight,
         reverse=True
     )
 
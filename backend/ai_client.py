@@ -5,24 +5,148 @@ Uses NEW Google Gemini SDK (google-genai)
 
 import os
 import json
-from typing import Dict, Any, Optional
+import re
+import time
+import random
+import asyncio
+import importlib.util
+import threading
+from typing import Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
+from caching import ResponseCache, build_response_cache, response_key
 
 # Load environment variables
 load_dotenv()
 
+# google-genai costs ~0.5s to import, so it is only located here and loaded by
+# the first client built (see _load_genai)
 try:
-    from google import genai
-    from google.genai.types import GenerateContentConfig
-    GEMINI_AVAILABLE = True
+    GEMINI_AVAILABLE = importlib.util.find_spec("google.genai") is not None
 except ImportError:
     GEMINI_AVAILABLE = False
+if not GEMINI_AVAILABLE:
     print("⚠️  google-genai not installed. AI features disabled.")
 
+genai = None
+GenerateContentConfig = None
+
 # Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 AI_PROVIDER = os.getenv("AI_PROVIDER", "gemini")
 GEMINI_MODEL = "gemini-2.5-flash"  # Latest available model
+STRUCTURED_TEMPERATURE = 0.3
+MAX_OUTPUT_TOKENS = 8192
+
+# Response cache: identical prompts / PDFs are answered without a network call
+AI_CACHE_BACKEND = os.getenv("AI_CACHE_BACKEND", "memory")  # memory | file | none
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".ai_cache"))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1000"))
+AI_CACHE_TTL_SECONDS = float(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Async client: in-flight Gemini calls per process, sharing one connection pool
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "32"))
+AI_REQUEST_TIMEOUT_SECONDS = float(os.getenv("AI_REQUEST_TIMEOUT_SECONDS", "120"))
+
+# Retry policy for 429 rate limits
+MAX_RETRIES = 3
+BASE_DELAY = 2
+
+OCR_PROMPT = """
+            You are a precise OCR engine. 
+            Extract ALL text from this resume document verbatim.
+            Do not summarize. Do not format. Just return the raw text content.
+            If the document is empty or unreadable, return nothing.
+            """
+
+
+def _token_count(response) -> int:
+    """Total tokens billed for a response (0 if the SDK didn't report usage)."""
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None) or 0
+
+
+def _hit_token_cap(response) -> bool:
+    """True when generation stopped at max_output_tokens (output is cut off)."""
+    candidates = getattr(response, "candidates", None) or []
+    if not candidates:
+        return False
+    reason = getattr(candidates[0], "finish_reason", None)
+    return getattr(reason, "name", str(reason)) == "MAX_TOKENS"
+
+
+def _structured_prompt(prompt: str, response_schema: Dict[str, Any]) -> str:
+    """Add the JSON instruction to a prompt."""
+    return f"""{prompt}
+
+IMPORTANT: Respond ONLY with valid JSON matching this schema.
+Keep text descriptions CONCISE and professional to ensure valid JSON output.
+{json.dumps(response_schema, indent=2)}
+
+Do not include any explanation or markdown formatting. Just the raw JSON."""
+
+
+def _parse_structured_text(response_text: str) -> Dict:
+    """
+    Parse model output as JSON, tolerating code fences and trailing commas.
+    
+    Raises:
+        json.JSONDecodeError: if the text cannot be repaired
+    """
+    response_text = response_text.strip()
+    
+    # Remove markdown code blocks if present
+    # Handle ```json ... ``` and just ``` ... ```
+    if "```" in response_text:
+        # Find the first { and last }
+        start_idx = response_text.find("{")
+        end_idx = response_text.rfind("}")
+        if start_idx != -1 and end_idx != -1:
+            response_text = response_text[start_idx:end_idx+1]
+    
+    # Parse JSON
+    try:
+        result = json.loads(response_text)
+        print(f"✅ AI Analysis successful!")
+    except json.JSONDecodeError:
+        # Last ditch effort: try to repair common JSON issues
+        # Fix trailing commas
+        response_text = re.sub(r',(\s*})', r'\1', response_text)
+        response_text = re.sub(r',(\s*])', r'\1', response_text)
+        result = json.loads(response_text)
+        print(f"✅ AI Analysis successful (after repair)!")
+    return result
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    return "429" in str(error)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter so concurrent retries don't stampede."""
+    return (BASE_DELAY * (2 ** attempt)) + random.uniform(0, 1)
+
+
+def _http_options():
+    """
+    One bounded httpx connection pool for the SDK's aio surface.
+    Older google-genai releases lack httpx_async_client; they keep their default client.
+    """
+    try:
+        import httpx
+        from google.genai.types import HttpOptions
+        limits = httpx.Limits(max_connections=AI_MAX_CONCURRENCY, max_keepalive_connections=AI_MAX_CONCURRENCY)
+        return HttpOptions(httpx_async_client=httpx.AsyncClient(limits=limits, timeout=AI_REQUEST_TIMEOUT_SECONDS))
+    except Exception:
+        return None
+
+
+def _load_genai():
+    """Import the Gemini SDK into this module on first use."""
+    global genai, GenerateContentConfig
+    if genai is None:
+        from google import genai as sdk
+        from google.genai.types import GenerateContentConfig as config
+        genai, GenerateContentConfig = sdk, config
 
 
 class AIClient:
@@ -30,6 +154,7 @@ class AIClient:
     
     _instance = None
     _client = None
+    _cache: Optional[ResponseCache] = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -39,6 +164,8 @@ class AIClient:
     
     def _initialize(self):
         """Initialize the AI client"""
+        self._cache = build_response_cache(AI_CACHE_BACKEND, AI_CACHE_PATH, AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL_SECONDS)
+        
         if not GEMINI_AVAILABLE:
             print("❌ Gemini SDK not available")
             return
@@ -48,7 +175,12 @@ class AIClient:
             return
         
         try:
-            self._client = genai.Client(api_key=GEMINI_API_KEY)
+            _load_genai()
+            http_options = _http_options()
+            if http_options is not None:
+                self._client = genai.Client(api_key=GEMINI_API_KEY, http_options=http_options)
+            else:
+                self._client = genai.Client(api_key=GEMINI_API_KEY)
             print(f"✅ AI Client initialized with {GEMINI_MODEL}")
         except Exception as e:
             print(f"❌ Failed to initialize AI client: {e}")
@@ -57,6 +189,14 @@ class AIClient:
         """Check if AI client is ready"""
         return self._client is not None
     
+    def set_cache(self, cache: Optional[ResponseCache]):
+        """Swap the response cache backend (None disables caching)."""
+        self._cache = cache
+    
+    def cache_stats(self) -> Optional[Dict]:
+        """Hits, misses and Gemini calls/tokens saved by the response cache."""
+        return self._cache.stats() if self._cache is not None else None
+    
     def analyze_with_structured_output(
         self, 
         prompt: str, 
@@ -78,36 +218,31 @@ class AIClient:
         
         try:
             # Add JSON instruction to prompt
-            full_prompt = f"""{prompt}
-
-IMPORTANT: Respond ONLY with valid JSON matching this schema.
-Keep text descriptions CONCISE and professional to ensure valid JSON output.
-{json.dumps(response_schema, indent=2)}
-
-Do not include any explanation or markdown formatting. Just the raw JSON."""
+            full_prompt = _structured_prompt(prompt, response_schema)
             
-            # Retry logic with exponential backoff
-            import time
-            import random
-            
-            max_retries = 3
-            base_delay = 2
+            cache_key = response_key("structured", GEMINI_MODEL, STRUCTURED_TEMPERATURE, MAX_OUTPUT_TOKENS, prompt, response_schema)
+            if self._cache is not None:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    print("⚡ AI response cache hit")
+                    return cached
             
-            for attempt in range(max_retries):
+            # Retry logic with exponential backoff
+            for attempt in range(MAX_RETRIES):
                 try:
                     # Make API call with NEW SDK
                     response = self._client.models.generate_content(
                         model=GEMINI_MODEL,
                         contents=full_prompt,
                         config=GenerateContentConfig(
-                            temperature=0.3,
-                            max_output_tokens=8192 # Increased to prevent truncation
+                            temperature=STRUCTURED_TEMPERATURE,
+                            max_output_tokens=MAX_OUTPUT_TOKENS # Increased to prevent truncation
                         )
                     )
                     break # Success!
                 except Exception as e:
-                    if "429" in str(e) and attempt < max_retries - 1:
-                        wait_time = (base_delay * (2 ** attempt)) + random.uniform(0, 1)
+                    if _is_rate_limited(e) and attempt < MAX_RETRIES - 1:
+                        wait_time = _backoff_delay(attempt)
                         print(f"⚠️ Rate limit hit. Retrying in {wait_time:.1f}s...")
                         time.sleep(wait_time)
                         continue
@@ -118,32 +253,12 @@ Do not include any explanation or markdown formatting. Just the raw JSON."""
             if not response.text:
                 print("❌ Empty response from AI")
                 return None
-                
-            response_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            # Handle ```json ... ``` and just ``` ... ```
-            if "```" in response_text:
-                # Find the first { and last }
-                start_idx = response_text.find("{")
-                end_idx = response_text.rfind("}")
-                if start_idx != -1 and end_idx != -1:
-                    response_text = response_text[start_idx:end_idx+1]
-            
-            # Parse JSON
-            try:
-                result = json.loads(response_text)
-                print(f"✅ AI Analysis successful!")
-                return result
-            except json.JSONDecodeError:
-                # Last ditch effort: try to repair common JSON issues
-                import re
-                # Fix trailing commas
-                response_text = re.sub(r',(\s*})', r'\1', response_text)
-                response_text = re.sub(r',(\s*])', r'\1', response_text)
-                result = json.loads(response_text)
-                print(f"✅ AI Analysis successful (after repair)!")
-                return result
+            
+            result = _parse_structured_text(response.text)
+            
+            if self._cache is not None:
+                self._cache.set(cache_key, result, _token_count(response))
+            return result
             
         except json.JSONDecodeError as e:
             print(f"❌ Failed to parse AI response as JSON: {e}")
@@ -152,7 +267,7 @@ Do not include any explanation or markdown formatting. Just the raw JSON."""
         except Exception as e:
             print(f"❌ AI analysis failed: {e}")
             # Check for rate limit specifically
-            if "429" in str(e):
+            if _is_rate_limited(e):
                 print("⚠️ Retries exhausted. Rate limit persist.")
             return None
 
@@ -167,31 +282,34 @@ Do not include any explanation or markdown formatting. Just the raw JSON."""
             print("⚠️  AI not available for OCR fallback")
             return None
 
+        cache_key = response_key("ocr", GEMINI_MODEL, OCR_PROMPT, pdf_bytes)
+        if self._cache is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                print("⚡ AI OCR cache hit")
+                return cached
+        
         try:
             print("👁️ Using Gemini Vision for Resume OCR...")
             
-            prompt = """
-            You are a precise OCR engine. 
-            Extract ALL text from this resume document verbatim.
-            Do not summarize. Do not format. Just return the raw text content.
-            If the document is empty or unreadable, return nothing.
-            """
-            
             response = self._client.models.generate_content(
                 model=GEMINI_MODEL,
                 contents=[
-                    prompt,
+                    OCR_PROMPT,
                     genai.types.Part.from_bytes(data=pdf_bytes, mime_type="application/pdf")
                 ],
                 config=GenerateContentConfig(
                     temperature=0.0,
-                    max_output_tokens=8192
+                    max_output_tokens=MAX_OUTPUT_TOKENS
                 )
             )
             
             if response.text:
                 print(f"✅ Gemini OCR successful: {len(response.text)} chars")
-                return response.text.strip()
+                text = response.text.strip()
+                if self._cache is not None:
+                    self._cache.set(cache_key, text, _token_count(response))
+                return text
             
             return None
             
@@ -200,10 +318,155 @@ Do not include any explanation or markdown formatting. Just the raw JSON."""
             return None
 
 
-# Global instance
-ai_client = AIClient()
+class AsyncAIClient:
+    """
+    Asyncio twin of AIClient built on the SDK's aio surface.
+    Shares the sync client's connection pool and response cache; a per-process
+    semaphore caps in-flight calls and 429 backoff uses asyncio.sleep, so one
+    worker can keep dozens of grading/OCR calls in flight without a thread each.
+    """
+    
+    def __init__(self, sync_client: AIClient, max_concurrency: int = AI_MAX_CONCURRENCY):
+        self._sync = sync_client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    def is_available(self) -> bool:
+        return self._sync.is_available()
+    
+    @property
+    def _cache(self) -> Optional[ResponseCache]:
+        return self._sync._cache
+    
+    async def _generate(self, contents, config):
+        """generate_content with bounded concurrency and non-blocking 429 backoff."""
+        for attempt in range(MAX_RETRIES):
+            try:
+                async with self._semaphore:
+                    return await self._sync._client.aio.models.generate_content(
+                        model=GEMINI_MODEL,
+                        contents=contents,
+                        config=config
+                    )
+            except Exception as e:
+                if _is_rate_limited(e) and attempt < MAX_RETRIES - 1:
+                    wait_time = _backoff_delay(attempt)
+                    print(f"⚠️ Rate limit hit. Retrying in {wait_time:.1f}s...")
+                    await asyncio.sleep(wait_time)  # semaphore released while waiting
+                    continue
+                raise
+    
+    async def analyze_with_structured_output(
+        self,
+        prompt: str,
+        response_schema: Dict[str, Any]
+    ) -> Optional[Dict]:
+        """Async version of AIClient.analyze_with_structured_output."""
+        if not self.is_available():
+            print("⚠️  AI not available, using fallback")
+            return None
+        
+        cache_key = response_key("structured", GEMINI_MODEL, STRUCTURED_TEMPERATURE, MAX_OUTPUT_TOKENS, prompt, response_schema)
+        if self._cache is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                print("⚡ AI response cache hit")
+                return cached
+        
+        response = None
+        try:
+            response = await self._generate(
+                _structured_prompt(prompt, response_schema),
+                GenerateContentConfig(
+                    temperature=STRUCTURED_TEMPERATURE,
+                    max_output_tokens=MAX_OUTPUT_TOKENS
+                )
+            )
+            
+            if not response.text:
+                print("❌ Empty response from AI")
+                return None
+            
+            result = _parse_structured_text(response.text)
+            if self._cache is not None:
+                self._cache.set(cache_key, result, _token_count(response))
+            return result
+            
+        except json.JSONDecodeError as e:
+            print(f"❌ Failed to parse AI response as JSON: {e}")
+            print(f"Raw Response: {response.text[:500]}...")
+            return None
+        except Exception as e:
+            print(f"❌ AI analysis failed: {e}")
+            if _is_rate_limited(e):
+                print("⚠️ Retries exhausted. Rate limit persist.")
+            return None
+    
+    async def extract_text_from_pdf(self, pdf_bytes: bytes) -> Optional[str]:
+        """Async version of AIClient.extract_text_from_pdf."""
+        text, _ = await self.extract_text_from_pdf_checked(pdf_bytes)
+        return text
+    
+    async def extract_text_from_pdf_checked(self, pdf_bytes: bytes) -> Tuple[Optional[str], bool]:
+        """
+        OCR a PDF and report whether the output hit the max_output_tokens cap.
+        
+        Returns:
+            (text or None, truncated); truncated text is returned but never cached
+        """
+        if not self.is_available():
+            print("⚠️  AI not available for OCR fallback")
+            return None, False
+        
+        cache_key = response_key("ocr", GEMINI_MODEL, OCR_PROMPT, pdf_bytes)
+        if self._cache is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                print("⚡ AI OCR cache hit")
+                return cached, False
+        
+        try:
+            print("👁️ Using Gemini Vision for Resume OCR...")
+            response = await self._generate(
+                [
+                    OCR_PROMPT,
+                    genai.types.Part.from_bytes(data=pdf_bytes, mime_type="application/pdf")
+                ],
+                GenerateContentConfig(
+                    temperature=0.0,
+                    max_output_tokens=MAX_OUTPUT_TOKENS
+                )
+            )
+            
+            truncated = _hit_token_cap(response)
+            if response.text:
+                print(f"✅ Gemini OCR successful: {len(response.text)} chars" + (" (truncated)" if truncated else ""))
+                text = response.text.strip()
+                if self._cache is not None and not truncated:
+                    self._cache.set(cache_key, text, _token_count(response))
+                return text, truncated
+            
+            return None, truncated
+            
+        except Exception as e:
+            print(f"❌ Gemini OCR failed: {e}")
+            return None, False
+
+
+# Global instances, built on first use so importing this module stays cheap
+_async_ai_client: Optional[AsyncAIClient] = None
+_instance_lock = threading.Lock()
 
 
 def get_ai_client() -> AIClient:
     """Get the global AI client instance"""
-    return ai_client
+    with _instance_lock:
+        return AIClient()
+
+
+def get_async_ai_client() -> AsyncAIClient:
+    """Get the global asyncio AI client instance"""
+    global _async_ai_client
+    with _instance_lock:
+        if _async_ai_client is None:
+            _async_ai_client = AsyncAIClient(AIClient())
+        return _async_ai_client
@@ -0,0 +1,176 @@
+"""
+Analysis Cache
+Content-addressed cache of full analysis results: an in-memory LRU in front of an
+on-disk SQLite store. Keys combine the SHA-256 of the uploaded PDF with the taxonomy
+version and the AI model, so a taxonomy or model change never serves stale results.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ai_client import GEMINI_MODEL
+from taxonomy import taxonomy_version
+from caching import LRUCache
+
+
+# Configuration
+CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", os.path.join(os.path.dirname(__file__), "analysis_cache.sqlite3"))
+CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_MEMORY_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MEMORY_ENTRIES", "256"))
+CACHE_DISK_ENTRIES = int(os.getenv("ANALYSIS_CACHE_DISK_ENTRIES", "20000"))
+
+# Bump when the shape or meaning of analysis results changes
+PIPELINE_VERSION = "3.4"
+
+
+class SQLiteCache:
+    """On-disk JSON store with TTL and least-recently-used eviction."""
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now + self.ttl_seconds, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        excess = self._count() - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+
+class AnalysisCache:
+    """Two-tier cache (memory, then disk) with hit/miss counters."""
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+    @property
+    def version(self) -> str:
+        """Follows the live taxonomy, so a hot-reloaded taxonomy starts a fresh key space."""
+        return self.version_for(taxonomy_version())
+
+    @staticmethod
+    def version_for(taxonomy: str) -> str:
+        return f"{PIPELINE_VERSION}:{taxonomy}:{GEMINI_MODEL}"
+
+    @staticmethod
+    def content_hash(content) -> str:
+        """Digest of the PDF bytes (any buffer: bytes, memoryview, mmap)."""
+        return hashlib.sha256(content).hexdigest()
+
+    def key(self, content_hash: str, taxonomy: Optional[str] = None) -> str:
+        """
+        Cache key for a content hash under a taxonomy version (default: the live one).
+        Results are stored under the version they were computed with, which a
+        reload between lookup and store can make differ from the live one.
+        """
+        version = self.version_for(taxonomy) if taxonomy is not None else self.version
+        return f"{content_hash}:{version}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._counters["memory_hits"] += 1
+            return value
+
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:
+                print(f"⚠️ Analysis cache read failed: {e}")
+                value = None
+            if value is not None:
+                self._counters["disk_hits"] += 1
+                self.memory.set(key, value)
+                return value
+
+        self._counters["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Dict):
+        self._counters["stores"] += 1
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                print(f"⚠️ Analysis cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+        hits = lookups - self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+            "version": self.version
+        }
+
+
+def _build_cache() -> Optional[AnalysisCache]:
+    if not CACHE_ENABLED:
+        return None
+    disk = None
+    if CACHE_PATH:
+        try:
+            disk = SQLiteCache(CACHE_PATH, CACHE_DISK_ENTRIES, CACHE_TTL_SECONDS)
+        except sqlite3.Error as e:
+            print(f"⚠️ Analysis cache disk tier disabled: {e}")
+    return AnalysisCache(LRUCache(CACHE_MEMORY_ENTRIES, CACHE_TTL_SECONDS), disk)
+
+
+# Global instance (None when disabled)
+analysis_cache = _build_cache()
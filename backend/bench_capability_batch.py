@@ -0,0 +1,73 @@
+"""
+Capability Batch Benchmark
+Scores synthetic resumes with the per-skill CapabilityScorer and with the columnar
+assess_capabilities_batch (with and without evidence dicts), checks the two agree
+exactly, and times both as the batch grows.
+Run: python bench_capability_batch.py
+"""
+
+import contextlib
+import io
+import random
+import time
+
+from resume_document import ResumeDocument
+from section_extractor import extract_resume_sections
+from skills import SKILLS_LIST
+from agents.project_agent import analyze_projects
+from agents.capability_agent import assess_capabilities, assess_capabilities_batch
+
+
+FILLER = "built designed scaled led microservice pipeline dashboard realtime platform".split()
+
+
+def synthetic_resume(rng, vocabulary):
+    """(project_analysis, skill_frequency) of one generated resume."""
+    lines = ["projects"]
+    for i in range(rng.randint(1, 10)):
+        lines.append(f"{' '.join(rng.sample(vocabulary, rng.randint(0, 2)))} project {i}")
+        lines.append(" ".join(rng.choice(vocabulary + FILLER * 3) for _ in range(rng.randint(10, 50)))
+                     + f" serving {rng.randint(10, 100000)} users")
+    lines.append("skills")
+    lines.append(", ".join(rng.sample(vocabulary, rng.randint(5, 25))))
+
+    document = ResumeDocument("\n".join(lines).lower())
+    with contextlib.redirect_stdout(io.StringIO()):  # agents print progress
+        sections = extract_resume_sections(document)
+        project_analysis = analyze_projects(sections['projects'], document)
+    return project_analysis, document.frequency
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(repeat=5, seed=7):
+    rng = random.Random(seed)
+    vocabulary = sorted(set(s.lower() for s in SKILLS_LIST))
+    resumes = [synthetic_resume(rng, vocabulary) for _ in range(1000)]
+
+    batch_reports = assess_capabilities_batch(resumes, include_evidence=True)
+    mismatches = sum(
+        assess_capabilities(*resume) != report
+        for resume, report in zip(resumes, batch_reports)
+    )
+    print(f"Resumes: {len(resumes)}, skills scored: {sum(len(f) for _, f in resumes)}, "
+          f"mismatches: {mismatches}\n")
+
+    print(f"{'resumes':>8} | {'scalar ms':>10} | {'batch ms':>9} | {'+evidence ms':>12} | {'speedup':>8}")
+    print("-" * 60)
+    for size in (1, 10, 100, 1000):
+        batch = resumes[:size]
+        scalar_ms = timed(lambda: [assess_capabilities(*resume) for resume in batch], repeat)
+        batch_ms = timed(lambda: assess_capabilities_batch(batch), repeat)
+        evidence_ms = timed(lambda: assess_capabilities_batch(batch, include_evidence=True), repeat)
+        print(f"{size:>8} | {scalar_ms:>10.2f} | {batch_ms:>9.2f} | {evidence_ms:>12.2f} | "
+              f"{scalar_ms / batch_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run()
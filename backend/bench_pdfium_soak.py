@@ -0,0 +1,68 @@
+"""
+pdfium Soak Benchmark
+Runs the extraction layer (page count, page-range extraction with the pdfium retry,
+whole-file pdfium extraction) over many documents in one process, as a long-lived
+worker would, and samples RSS along the way. RSS should level off after warm-up
+instead of climbing with the document count.
+Run: python bench_pdfium_soak.py [documents] [sample_every]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from bench_pdf_extraction import make_pdf
+from utils import extract_page_range, extract_text_pdfium, pdf_page_count
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run(documents: int, sample_every: int):
+    # A few shapes of document, in memory and spooled to disk (both PdfSource kinds)
+    corpus = [make_pdf(pages, lines_per_page=lines) for pages, lines in ((1, 30), (2, 24), (4, 12))]
+    spooled = []
+    for content in corpus:
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, "wb") as out:
+            out.write(content)
+        spooled.append(path)
+    sources = corpus + spooled
+
+    print(f"Documents: {documents}\n")
+    print(f"{'docs':>7} | {'RSS MB':>8} | {'docs/s':>8}")
+    print("-" * 30)
+    samples = []
+    try:
+        started = time.perf_counter()
+        for done in range(1, documents + 1):
+            source = sources[done % len(sources)]
+            page_count = pdf_page_count(source)
+            extract_page_range(source, 0, page_count)
+            extract_text_pdfium(source)
+            if done % sample_every == 0:
+                samples.append(rss_mb())
+                rate = done / (time.perf_counter() - started)
+                print(f"{done:>7} | {samples[-1]:>8.1f} | {rate:>8.0f}")
+    finally:
+        for path in spooled:
+            os.remove(path)
+
+    if len(samples) >= 2:
+        # The first samples absorb allocator warm-up; steady growth after that is a leak
+        half = samples[len(samples) // 2]
+        print(f"\nGrowth over the second half: {samples[-1] - half:+.1f} MB")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
@@ -0,0 +1,94 @@
+"""
+Role Index Benchmark
+Per-request role matching cost as the role catalog grows: the legacy scan
+(set intersection with every role, then max) against RoleIndex.top_k, which only
+scores roles sharing a skill with the candidate. Below ROLE_INDEX_MIN_ROLES the
+index scans instead ("engine"). "score ms" is the overlap scoring alone, the
+like-for-like cost against the legacy scan; top-5 adds the per-role breakdown
+(matched skills, coverage) the legacy scan never computed. Synthetic roles are
+added the way an occupational catalog grows, with new fields bringing new
+skills, so each skill's posting list stays short.
+Run: python bench_role_index.py
+"""
+
+import random
+import string
+import time
+
+from role_index import RoleIndex
+from taxonomy import get_taxonomy
+
+
+CANDIDATE_SKILLS = [
+    "python", "fastapi", "postgresql", "redis", "kafka", "aws", "docker", "kubernetes",
+    "terraform", "react", "typescript", "pytorch", "scikit-learn", "git", "linux"
+]
+
+SKILLS_PER_ROLE = 15
+NEW_SKILLS_PER_ROLE = 3
+
+
+def synthetic_catalog(size, base_roles, base_skills, seed=11):
+    """base_roles plus generated roles up to size."""
+    rng = random.Random(seed)
+    roles = dict(base_roles)
+    vocabulary = list(base_skills)
+    while len(roles) < size:
+        # Every new role brings a few skills of its own field
+        vocabulary.extend(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+            for _ in range(NEW_SKILLS_PER_ROLE)
+        )
+        roles[f"Occupation {len(roles)}"] = rng.sample(vocabulary, SKILLS_PER_ROLE)
+    return roles
+
+
+def legacy_best_role(roles, user_skills):
+    role_scores = {}
+    for role, required in roles.items():
+        role_scores[role] = len(set(user_skills) & set(required))
+    best_role = max(role_scores, key=role_scores.get)
+    return best_role, role_scores
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(repeat=200):
+    taxonomy = get_taxonomy()
+    print(f"Candidate skills: {len(CANDIDATE_SKILLS)}\n")
+    print(f"{'roles':>7} | {'engine':>6} | {'scan ms':>8} | {'score ms':>8} | {'top-5 ms':>8} | "
+          f"{'weighted ms':>11} | {'touched':>7} | {'speedup':>8} | {'build ms':>8}")
+    print("-" * 100)
+
+    for size in (len(taxonomy.roles), 100, 1000, 5000, 20000):
+        roles = synthetic_catalog(size, taxonomy.roles, taxonomy.skills)
+
+        build_start = time.perf_counter()
+        index = RoleIndex.from_roles(roles, taxonomy.weight)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        best, _ = legacy_best_role(roles, CANDIDATE_SKILLS)
+        matches = index.top_k(CANDIDATE_SKILLS, 5)
+        assert matches[0]['role'] == best
+
+        scan_repeat = max(1, repeat * len(taxonomy.roles) // size)
+        scan_ms = timed(lambda: legacy_best_role(roles, CANDIDATE_SKILLS), scan_repeat)
+        scanned = len(index) < index.min_roles
+        score = index.scan if scanned else index.scores
+        score_ms = timed(lambda: score(CANDIDATE_SKILLS), repeat)
+        index_ms = timed(lambda: index.top_k(CANDIDATE_SKILLS, 5), repeat)
+        weighted_ms = timed(lambda: index.top_k(CANDIDATE_SKILLS, 5, weighted=True), repeat)
+        touched = len(index.scores(CANDIDATE_SKILLS))
+
+        print(f"{size:>7} | {'scan' if scanned else 'index':>6} | {scan_ms:>8.3f} | {score_ms:>8.3f} | "
+              f"{index_ms:>8.3f} | {weighted_ms:>11.3f} | {touched:>7} | {scan_ms / score_ms:>7.1f}x | "
+              f"{build_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    run()
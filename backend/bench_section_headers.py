@@ -0,0 +1,150 @@
+"""
+Section Header Benchmark
+Accuracy and speed of the legacy header scan (uncompiled re.search of every pattern,
+anywhere in the line) against SectionExtractor.classify_header on labeled lines.
+Run: python bench_section_headers.py
+"""
+
+import re
+import time
+
+from section_extractor import SectionExtractor
+
+
+LEGACY_PATTERNS = {
+    'objective': r'(?:objective|summary|profile|about\s*me|professional\s*summary|career\s*objective)',
+    'projects': r'(?:projects?|portfolio|work\s*samples?|personal\s*projects?)',
+    'experience': r'(?:experience|work\s*history|employment|professional\s*experience|work\s*experience)',
+    'education': r'(?:education|academic|qualifications?|degrees?)',
+    'skills': r'(?:skills?|technical\s*skills?|technologies|competencies)',
+    'certifications': r'(?:certifications?|certificates?|licenses?)',
+    'achievements': r'(?:achievements?|awards?|accomplishments?|honors?)'
+}
+
+# (line as it appears in a resume, expected section or None for content)
+LABELED_LINES = [
+    # Headers
+    ("SUMMARY", 'objective'),
+    ("Professional Summary", 'objective'),
+    ("Career Objective:", 'objective'),
+    ("About Me", 'objective'),
+    ("Summary of Qualifications", 'objective'),
+    ("Summary: Backend engineer focused on data platforms", 'objective'),
+    ("PROJECTS", 'projects'),
+    ("Personal Projects", 'projects'),
+    ("Academic Projects:", 'projects'),
+    ("Projects (Selected)", 'projects'),
+    ("2. Projects", 'projects'),
+    ("Portfolio", 'projects'),
+    ("EXPERIENCE", 'experience'),
+    ("Professional Experience", 'experience'),
+    ("Work Experience:", 'experience'),
+    ("Relevant Experience", 'experience'),
+    ("Work History", 'experience'),
+    ("Employment History", 'experience'),
+    ("## Experience", 'experience'),
+    ("EDUCATION", 'education'),
+    ("Education and Training", 'education'),
+    ("Academic Background", 'education'),
+    ("Qualifications", 'education'),
+    ("SKILLS", 'skills'),
+    ("Technical Skills", 'skills'),
+    ("Technical Skills & Tools", 'skills'),
+    ("Skills: Python, Java, SQL", 'skills'),
+    ("Core Competencies", 'skills'),
+    ("Technologies", 'skills'),
+    ("CERTIFICATIONS", 'certifications'),
+    ("Certifications & Licenses", 'certifications'),
+    ("Licenses", 'certifications'),
+    ("ACHIEVEMENTS", 'achievements'),
+    ("Awards and Honors", 'achievements'),
+    ("Academic Achievements", 'achievements'),
+    ("Accomplishments", 'achievements'),
+    # Known misses: a free word after the keyword reads like a sentence
+    ("Experience Highlights", 'experience'),
+    ("Skills Summary", 'skills'),
+    # Content that mentions a section keyword
+    ("Jane Doe | Software Engineer | jane@example.com", None),
+    ("5+ years of experience building distributed systems in Go and Python.", None),
+    ("• Gained hands-on experience with Docker and Kubernetes", None),
+    ("- Led 3 projects migrating monoliths to microservices", None),
+    ("Experience with AWS Lambda, DynamoDB and API Gateway", None),
+    ("Technologies: React, Node.js, MongoDB", None),
+    ("Technologies used: Flask, PostgreSQL, Redis", None),
+    ("Built a portfolio website with Next.js and Tailwind", None),
+    ("Summary statistics dashboard for 2M daily events", None),
+    ("Received the Dean's award for academic excellence", None),
+    ("Education Management System (Django, MySQL)", None),
+    ("Profile matching service using embeddings and FAISS", None),
+    ("Skills gap analysis tool for HR teams", None),
+    ("Projects include a compiler, a ray tracer and a chess engine", None),
+    ("Employment verification microservice in Spring Boot", None),
+    ("Certificate management automation with Terraform", None),
+    ("Honors thesis on federated learning", None),
+    ("Awarded best hackathon project among 120 teams.", None),
+    ("Degree: B.Tech in Computer Science, 8.9 CGPA", None),
+]
+
+
+def legacy_classify(line: str):
+    for section_name, pattern in LEGACY_PATTERNS.items():
+        if re.search(pattern, line.lower()):
+            return section_name
+    return None
+
+
+def compiled_classify(line: str, cased: bool):
+    return SectionExtractor.classify_header(line, cased)
+
+
+def score(classify, lines):
+    """(accuracy, header precision, header recall) over labeled lines."""
+    correct = tp = fp = fn = 0
+    for line, expected in lines:
+        got = classify(line)
+        correct += got == expected
+        if got is not None and got == expected:
+            tp += 1
+        elif got is not None:
+            fp += 1
+        if expected is not None and got != expected:
+            fn += 1
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return correct / len(lines), precision, recall
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(repeat=20):
+    # The pipeline lowercases extracted text; OCR text keeps its case
+    lowered = [(line.lower(), expected) for line, expected in LABELED_LINES]
+    print(f"Labeled lines: {len(LABELED_LINES)} "
+          f"({sum(e is not None for _, e in LABELED_LINES)} headers)\n")
+    print(f"{'classifier':>22} | {'accuracy':>8} | {'precision':>9} | {'recall':>6}")
+    print("-" * 56)
+    for name, classify, lines in (
+        ("legacy", legacy_classify, LABELED_LINES),
+        ("compiled (lowercase)", lambda l: compiled_classify(l, False), lowered),
+        ("compiled (cased)", lambda l: compiled_classify(l, True), LABELED_LINES),
+    ):
+        accuracy, precision, recall = score(classify, lines)
+        print(f"{name:>22} | {accuracy:>8.1%} | {precision:>9.1%} | {recall:>6.1%}")
+
+    print(f"\n{'lines':>7} | {'legacy ms':>10} | {'compiled ms':>11} | {'speedup':>8}")
+    print("-" * 46)
+    for size in (100, 1000, 10000):
+        lines = [line for line, _ in LABELED_LINES] * (size // len(LABELED_LINES) + 1)
+        lines = lines[:size]
+        legacy_ms = timed(lambda: [legacy_classify(line) for line in lines], repeat)
+        compiled_ms = timed(lambda: [compiled_classify(line, True) for line in lines], repeat)
+        print(f"{size:>7} | {legacy_ms:>10.2f} | {compiled_ms:>11.2f} | {legacy_ms / compiled_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,74 @@
+"""
+Skill Matcher Benchmark
+Compares the legacy per-skill text.count loop against the compiled PhraseMatcher
+as the taxonomy grows. Run: python bench_skill_matcher.py
+"""
+
+import random
+import string
+import time
+
+from skills import SKILLS_LIST
+from skill_matcher import PhraseMatcher
+
+
+SAMPLE_RESUME = """
+senior software engineer with 6 years of experience building scalable microservices.
+led a team of 5 engineers delivering a real-time analytics platform on aws using python,
+fastapi, postgresql, redis and kafka. containerized services with docker and kubernetes,
+automated ci/cd with github actions and terraform. built react and typescript dashboards,
+integrated machine learning models (pytorch, scikit-learn) for anomaly detection.
+mentored junior developers, ran code reviews and improved test coverage with pytest.
+""".strip()
+
+
+def legacy_extract(text, taxonomy):
+    frequency = {}
+    for skill in taxonomy:
+        count = text.count(skill.lower())
+        if count > 0:
+            frequency[skill] = count
+    return frequency
+
+
+def synthetic_taxonomy(size, seed=7):
+    rng = random.Random(seed)
+    taxonomy = list(dict.fromkeys(s.lower() for s in SKILLS_LIST))
+    while len(taxonomy) < size:
+        words = rng.randint(1, 3)
+        taxonomy.append(" ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+            for _ in range(words)
+        ))
+    return taxonomy
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(repeat=50):
+    text = " ".join([SAMPLE_RESUME] * 8)  # ~4k chars, a typical two-page resume
+    print(f"Resume length: {len(text)} chars\n")
+    print(f"{'taxonomy':>10} | {'legacy ms':>10} | {'matcher ms':>10} | {'speedup':>8} | {'build ms':>9}")
+    print("-" * 60)
+
+    for size in (len(set(SKILLS_LIST)), 1000, 5000, 10000, 20000):
+        taxonomy = synthetic_taxonomy(size)
+
+        build_start = time.perf_counter()
+        matcher = PhraseMatcher(taxonomy)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        legacy_ms = timed(lambda: legacy_extract(text, taxonomy), repeat)
+        matcher_ms = timed(lambda: matcher.count(text), repeat)
+
+        print(f"{size:>10} | {legacy_ms:>10.2f} | {matcher_ms:>10.2f} | "
+              f"{legacy_ms / matcher_ms:>7.1f}x | {build_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,69 @@
+"""
+Upload Memory Benchmark
+Peak RSS of one /analyze run on a large PDF when the upload is passed around as bytes
+(pickled into every worker job) versus spooled to disk and memory-mapped.
+Run: python bench_upload_memory.py [size_mb] [pages]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+
+def child(mode: str, pdf_path: str):
+    # Configure before the pipeline reads its settings at import
+    os.environ["UPLOAD_SPOOL_BYTES"] = str(1 << 40) if mode == "bytes" else "0"
+    os.environ.setdefault("CPU_WORKERS", "4")
+    os.environ["PARALLEL_EXTRACTION_MIN_PAGES"] = "2"
+    os.environ["ANALYSIS_CACHE_ENABLED"] = "false"
+    os.environ["GEMINI_API_KEY"] = ""
+    # Workers must be direct children for RUSAGE_CHILDREN to see them
+    os.environ["SANDBOX_START_METHOD"] = "fork"
+
+    import asyncio
+    import contextlib
+    import io
+    import resource
+    from fastapi import UploadFile
+    from pipeline import run_analysis
+    from upload_buffer import UploadBuffer
+    from concurrency import worker_pools
+
+    async def run():
+        with open(pdf_path, "rb") as f:
+            upload = await UploadBuffer.from_upload(UploadFile(f, size=os.path.getsize(pdf_path)))
+        with upload, contextlib.redirect_stdout(io.StringIO()):
+            await run_analysis(upload)
+        worker_pools.cpu.shutdown(wait=True)
+
+    asyncio.run(run())
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"{mode:>8} | {own:>14.1f} | {workers:>17.1f}")
+
+
+def run(size_mb: int, pages: int):
+    print(f"Upload: ~{size_mb} MB, {pages} pages (page-parallel extraction)\n")
+    print(f"{'mode':>8} | {'server peak MB':>14} | {'worker peak MB':>17}")
+    print("-" * 46)
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        # Generated out of process: ru_maxrss survives fork+exec, so this process stays small
+        subprocess.run([sys.executable, __file__, "--make", pdf_path, str(size_mb), str(pages)], check=True)
+        for mode in ("bytes", "spooled"):
+            subprocess.run([sys.executable, __file__, "--child", mode, pdf_path], check=True)
+    finally:
+        os.remove(pdf_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--make":
+        from bench_pdf_extraction import make_pdf
+        with open(sys.argv[2], "wb") as f:
+            f.write(make_pdf(int(sys.argv[4]), filler_bytes=int(sys.argv[3]) * 1024 * 1024))
+    elif len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 50, int(sys.argv[2]) if len(sys.argv) > 2 else 12)
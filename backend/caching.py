@@ -0,0 +1,192 @@
+"""
+Cache Backends
+In-memory LRU and the pluggable AI response caches (memory / file) used by AIClient.
+"""
+
+import abc
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# =================================
+# AI RESPONSE CACHE
+# =================================
+def response_key(*parts: Any) -> str:
+    """Stable SHA-256 over the request parts (model, temperature, prompt, schema, ...)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(bytes(part))
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ResponseCache(abc.ABC):
+    """
+    Base class for AI response caches.
+    Entries are {'value': ..., 'tokens': int}; tokens is what the original call cost,
+    so every hit can be counted as saved spend.
+    """
+
+    def __init__(self):
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "calls_saved": 0, "tokens_saved": 0}
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._load(key)
+        with self._stats_lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["calls_saved"] += 1
+            self._stats["tokens_saved"] += entry.get("tokens", 0)
+        return entry["value"]
+
+    def set(self, key: str, value: Any, tokens: int = 0):
+        with self._stats_lock:
+            self._stats["stores"] += 1
+        self._store(key, {"value": value, "tokens": tokens})
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {"backend": type(self).__name__, **self._stats}
+
+    @abc.abstractmethod
+    def _load(self, key: str) -> Optional[Dict]:
+        """The stored entry for key, or None when missing or expired."""
+
+    @abc.abstractmethod
+    def _store(self, key: str, entry: Dict):
+        """Persist entry under key."""
+
+
+class MemoryResponseCache(ResponseCache):
+    """Per-process LRU; fastest, lost on restart."""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 24 * 3600):
+        super().__init__()
+        self._lru = LRUCache(max_entries, ttl_seconds)
+
+    def _load(self, key: str) -> Optional[Dict]:
+        entry = self._lru.get(key)
+        # Callers may annotate the result (e.g. 'ai_powered'); never hand out the cached object
+        return copy.deepcopy(entry) if entry is not None else None
+
+    def _store(self, key: str, entry: Dict):
+        self._lru.set(key, entry)
+
+
+class FileResponseCache(ResponseCache):
+    """
+    One JSON file per entry in a directory; survives restarts and is shared by
+    every worker on the host. File mtime tracks last access for LRU eviction.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 5000, ttl_seconds: float = 7 * 24 * 3600):
+        super().__init__()
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def _store(self, key: str, entry: Dict):
+        entry = {**entry, "expires_at": time.time() + self.ttl_seconds}
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)  # atomic: readers never see a partial file
+        except OSError as e:
+            print(f"⚠️ AI response cache write failed: {e}")
+            self._remove(tmp_path)
+            return
+        self._evict()
+
+    def _evict(self):
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+        except OSError:
+            return
+        excess = len(entries) - self.max_entries
+        if excess > 0:
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            for entry in entries[:excess]:
+                self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def build_response_cache(backend: str, path: str, max_entries: int, ttl_seconds: float) -> Optional[ResponseCache]:
+    """Factory for AI_CACHE_BACKEND: 'memory', 'file' or 'none'."""
+    backend = backend.lower()
+    if backend == "memory":
+        return MemoryResponseCache(max_entries, ttl_seconds)
+    if backend == "file":
+        return FileResponseCache(path, max_entries, ttl_seconds)
+    return None
@@ -0,0 +1,132 @@
+"""
+Worker Pools
+Keeps blocking work off the event loop: CPU-bound stages (PDF parsing, agents) go to
+sandboxed worker processes (see sandbox.py), the remaining blocking calls (SQLite
+cache lookups, page-range coordination) to a bounded thread pool.
+Gemini calls are native asyncio (see ai_client.AsyncAIClient) and need neither.
+Admission control turns requests away with a fast 503 once the pools are saturated,
+instead of letting latency pile up in the queue.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sandbox import SandboxPool, SANDBOX_ENABLED
+
+
+# Configuration
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 2)))
+IO_WORKERS = int(os.getenv("IO_WORKERS", "8"))
+MAX_PENDING_REQUESTS = int(os.getenv("MAX_PENDING_REQUESTS", str(CPU_WORKERS * 4)))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "5"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", str(CPU_WORKERS)))
+
+
+class _ReservedStreamingResponse(StreamingResponse):
+    """Releases its reservation when the ASGI call returns or raises (incl. cancellation)."""
+
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+class WorkerPools:
+    """Lazily created process/thread pools plus an in-flight request limit."""
+
+    def __init__(self, cpu_workers: int, io_workers: int, max_pending: int):
+        self.cpu_workers = cpu_workers
+        self.io_workers = io_workers
+        self.max_pending = max_pending
+        self._cpu = None
+        self._io = None
+        self._pending = 0
+        self._rejected = 0
+
+    @property
+    def cpu(self) -> Executor:
+        if self._cpu is None:
+            if SANDBOX_ENABLED:
+                self._cpu = SandboxPool(self.cpu_workers)
+            else:
+                self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers)
+        return self._cpu
+
+    @property
+    def io(self) -> ThreadPoolExecutor:
+        if self._io is None:
+            self._io = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="kapp-io")
+        return self._io
+
+    async def run_cpu(self, fn, *args):
+        """Run a picklable function in the process pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.cpu, fn, *args)
+
+    async def run_io(self, fn, *args):
+        """Run a blocking call in the thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.io, fn, *args)
+
+    def reserve(self, cost: int = 1):
+        """
+        Reserve capacity for a request, or fail fast. Pair with release().
+
+        Raises:
+            HTTPException(503): with Retry-After when the server is saturated
+        """
+        if self._pending + cost > self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy analyzing other resumes. Please retry shortly.",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+        self._pending += cost
+
+    def release(self, cost: int = 1):
+        self._pending -= cost
+
+    @asynccontextmanager
+    async def admit(self, cost: int = 1):
+        """Hold reserved capacity for the duration of the block."""
+        self.reserve(cost)
+        try:
+            yield
+        finally:
+            self.release(cost)
+
+    def streaming_response(self, content, cost: int, **kwargs) -> StreamingResponse:
+        """
+        A StreamingResponse that owns cost reserved capacity and releases it once
+        sending ends, whether it finished, failed or the client disconnected.
+        """
+        return _ReservedStreamingResponse(content, release=lambda: self.release(cost), **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            "cpu_workers": self.cpu_workers,
+            "io_workers": self.io_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rejected": self._rejected,
+            "sandbox": self._cpu.stats() if isinstance(self._cpu, SandboxPool) else None
+        }
+
+    def shutdown(self):
+        if self._cpu is not None:
+            self._cpu.shutdown(wait=False, cancel_futures=True)
+            self._cpu = None
+        if self._io is not None:
+            self._io.shutdown(wait=False, cancel_futures=True)
+            self._io = None
+
+
+# Global instance (one per uvicorn worker)
+worker_pools = WorkerPools(CPU_WORKERS, IO_WORKERS, MAX_PENDING_REQUESTS)
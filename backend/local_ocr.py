@@ -0,0 +1,127 @@
+"""
+Local OCR Engine
+Offline OCR for scanned resumes: rasterize pages with pypdfium2 (or the bundled
+Poppler pdftoppm) and read them with Tesseract, page ranges in parallel on the CPU pool.
+Selected with OCR_ENGINE; Gemini OCR stays the last resort when this yields nothing.
+"""
+
+import importlib.util
+import io
+import os
+import shutil
+import subprocess
+from contextlib import closing
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import List, Optional
+from utils import map_page_ranges
+from upload_buffer import PdfSource, open_pdfium_document
+
+# Checked without importing; pytesseract and PIL load in the worker on first OCR
+TESSERACT_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ("pytesseract", "PIL")
+)
+
+
+# Configuration
+OCR_ENGINE = os.getenv("OCR_ENGINE", "gemini").lower()  # gemini | tesseract
+OCR_RASTERIZER = os.getenv("OCR_RASTERIZER", "pdfium").lower()  # pdfium | poppler
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", "tesseract")
+OCR_PAGE_TIMEOUT_SECONDS = float(os.getenv("OCR_PAGE_TIMEOUT_SECONDS", "30"))
+
+# Windows build shipped in backend/poppler/ (used only if that directory is present);
+# elsewhere pdftoppm is expected on PATH (poppler-utils) or under POPPLER_PATH
+BUNDLED_POPPLER = Path(__file__).parent / "poppler" / "poppler-24.08.0" / "Library" / "bin"
+POPPLER_PATH = os.getenv(
+    "POPPLER_PATH", str(BUNDLED_POPPLER) if os.name == "nt" and BUNDLED_POPPLER.is_dir() else ""
+)
+
+
+def is_available() -> bool:
+    """Local OCR is selected for this deployment and Tesseract can actually run."""
+    return OCR_ENGINE == "tesseract" and TESSERACT_AVAILABLE and shutil.which(TESSERACT_CMD) is not None
+
+
+def _pdftoppm() -> str:
+    return str(Path(POPPLER_PATH) / "pdftoppm") if POPPLER_PATH else "pdftoppm"
+
+
+def _render_poppler(content: PdfSource, index: int) -> "Image.Image":
+    """
+    One page as a grayscale PNG from pdftoppm (image on stdout without a root).
+    A hung pdftoppm is killed after OCR_PAGE_TIMEOUT_SECONDS (TimeoutExpired).
+    """
+    from PIL import Image
+    page = str(index + 1)
+    # Spooled uploads are read by path; bytes go over stdin
+    spooled = isinstance(content, str)
+    completed = subprocess.run(
+        [_pdftoppm(), "-r", str(OCR_DPI), "-f", page, "-l", page, "-gray", "-png", "-singlefile",
+         content if spooled else "-"],
+        input=None if spooled else content, capture_output=True, check=True,
+        timeout=OCR_PAGE_TIMEOUT_SECONDS
+    )
+    return Image.open(io.BytesIO(completed.stdout))
+
+
+def _image_to_text(image) -> str:
+    import pytesseract
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    return pytesseract.image_to_string(image, lang=OCR_LANGUAGE)
+
+
+def _ocr_pdfium_page(pdf, index: int) -> str:
+    """
+    Rasterize and OCR one page. A grayscale PIL image shares the bitmap's buffer,
+    so the bitmap and page are only closed once Tesseract is done with it.
+    """
+    with closing(pdf[index]) as page, \
+            closing(page.render(scale=OCR_DPI / 72, grayscale=True)) as bitmap:
+        return _image_to_text(bitmap.to_pil())
+
+
+def ocr_page_range(content: PdfSource, start: int, stop: int) -> List[Optional[str]]:
+    """
+    Tesseract text of pages [start, stop), one entry per page (None if a page fails).
+    Picklable entry point for the CPU worker pool.
+    """
+    pdf = open_pdfium_document(content) if OCR_RASTERIZER == "pdfium" else None
+    texts = []
+    try:
+        for index in range(start, stop):
+            try:
+                if pdf is not None:
+                    texts.append(_ocr_pdfium_page(pdf, index))
+                else:
+                    texts.append(_image_to_text(_render_poppler(content, index)))
+            except subprocess.TimeoutExpired:
+                print(f"⏱️ pdftoppm exceeded {OCR_PAGE_TIMEOUT_SECONDS:g}s on page {index + 1}; skipping it")
+                texts.append(None)
+            except Exception as e:
+                print(f"⚠️ Local OCR failed on page {index + 1}: {e}")
+                texts.append(None)
+    finally:
+        if pdf is not None:
+            pdf.close()
+    return texts
+
+
+def ocr_pdf_locally(content: PdfSource, executor: Executor, workers: int,
+                    page_count: int, page_timeout: float) -> Optional[str]:
+    """
+    OCR every page on the executor and join them in page order.
+
+    Returns:
+        The recognized text, or None when nothing was readable
+    """
+    if page_count <= 0:
+        return None
+    print(f"👁️ Using local Tesseract OCR ({page_count} pages, {OCR_RASTERIZER})...")
+    pages = map_page_ranges(ocr_page_range, content, executor, workers, page_count, page_timeout)
+    text = "\n".join(page_text.strip() for page_text in pages if page_text and page_text.strip())
+    if not text:
+        return None
+    print(f"✅ Local OCR successful: {len(text)} chars")
+    return text
@@ -1,13 +1,32 @@
-from fastapi import FastAPI, UploadFile, File
+from startup import startup_metrics, warm_up, WARMUP_ON_STARTUP
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from utils import extract_text, extract_skills
-from orchestrator import run_orchestrator
-from section_extractor import extract_resume_sections
-from agents.project_agent import analyze_projects
-from agents.capability_agent import assess_capabilities
-from agents.ai_grading_agent import grade_resume_with_ai
+from concurrency import worker_pools, BATCH_CONCURRENCY
+from analysis_cache import analysis_cache
+from ai_client import get_ai_client
+from pdf_classifier import classifier_metrics
+from taxonomy import taxonomy_store
+from pipeline import run_analysis, run_batch, ExtractionError, MAX_BATCH_FILES, MAX_PDF_BYTES, MAX_BATCH_BYTES
+from utils import expand_uploads
+from upload_buffer import UploadBuffer
 
-app = FastAPI()
+startup_metrics.record_import()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pay for lazy imports and worker start-up before the first request does
+    if WARMUP_ON_STARTUP:
+        await warm_up(worker_pools)
+    yield
+    worker_pools.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,100 +35,85 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def track_first_response(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    startup_metrics.record_response(request.url.path, started)
+    return response
+
 @app.get("/")
 def root():
     return {"message": "KAPP Career Intelligence Engine v3.0 - AI-Powered Analysis 🤖"}
 
+@app.get("/stats")
+def stats():
+    return {
+        "workers": worker_pools.stats(),
+        "analysis_cache": analysis_cache.stats() if analysis_cache is not None else None,
+        "ai_response_cache": get_ai_client().cache_stats(),
+        "pdf_classifier": classifier_metrics.stats(),
+        "startup": startup_metrics.stats(),
+        "taxonomy": taxonomy_store.stats()
+    }
+
 @app.post("/analyze/")
 async def analyze(file: UploadFile = File(...)):
     
-    # Step 1: Extract text from PDF
-    file_content = await file.read() # Read once
-    
-    # Mimic file for utils
-    import io
-    file.file = io.BytesIO(file_content)
-    
-    # Try local extraction
-    text = extract_text(file)
-    
-    # Step 2: Initial Skill Detection
-    print("🔍 Initial Skill Check...")
-    skills = []
-    if text:
-        skills, _ = extract_skills(text)
-    
-    # AI OCR FALLBACK 👁️
-    # Trigger if verify specific conditions:
-    # 1. Text is empty/short
-    # 2. OR very few skills detected (likely garbage text)
-    if not text or len(text.strip()) < 50 or len(skills) < 3:
-        print(f"⚠️  Quality Check Failed: TextLen={len(text) if text else 0}, Skills={len(skills)}")
-        print("🔄 Attempting AI OCR fallback...")
+    # Fail fast with 503 when every worker is busy
+    async with worker_pools.admit():
         
-        try:
-            from ai_client import ai_client
-            ocr_text = ai_client.extract_text_from_pdf(file_content)
-            
-            if ocr_text:
-                text = ocr_text
-                print(f"✅ Fallback to AI Text successful. New length: {len(text)}")
-                
-                # Re-extract skills with better text
-                skills, _ = extract_skills(text)
-                print(f"🔍 Re-check Skills: Found {len(skills)}")
-            else:
-                 print("⚠️ AI OCR returned None/Empty.")
-                 
-        except Exception as e:
-            print(f"❌ AI OCR Fallback failed: {e}")
-    
-    # Final check on text
-    if not text or len(text.strip()) < 10:
-        return {"error": "Unable to extract text from resume. Please ensure it's a valid PDF."}
+        # Step 1: Read the upload once (large files spool to disk and are memory-mapped)
+        with await UploadBuffer.from_upload(file) as upload:
+            try:
+                return await run_analysis(upload)
+            except ExtractionError as e:
+                return {"error": str(e)}
 
-    # Step 3: Extract structured sections (Now that we have best possible text)
-    print("📄 Extracting resume sections...")
-    sections = extract_resume_sections(text)
-    
-    # Step 4: Final Skills Extraction (if not already done or to get frequency)
-    print("🔍 Finalizing skills...")
-    skills, frequency = extract_skills(text)
-    
-    # Step 4: Analyze projects
-    print("🚀 Analyzing projects...")
-    project_analysis = analyze_projects(sections['projects'], text)
-    
-    # Step 5: Assess capabilities
-    print("💪 Assessing skill capabilities...")
-    capability_analysis = assess_capabilities(project_analysis, frequency)
+
+@app.post("/analyze/batch")
+async def analyze_batch(files: List[UploadFile] = File(...)):
+    """
+    Analyze many resumes (PDFs and/or zip archives of PDFs) in one request.
+    Streams NDJSON: one line per resume as soon as it finishes, then a summary line.
+    """
     
-    # Step 6: AI-POWERED GRADING 🤖
-    print("🤖 AI-Powered Resume Grading...")
-    resume_grade = grade_resume_with_ai(
-        resume_text=text,
-        detected_skills=skills,
-        project_analysis=project_analysis,
-        capability_analysis=capability_analysis
-    )
+    # Reserve the most this batch can use before buffering any upload, so a saturated
+    # server answers with a plain 503 without reading the whole batch first
+    reserved = max(1, min(BATCH_CONCURRENCY, worker_pools.max_pending))
+    worker_pools.reserve(reserved)
+    try:
+        items = []
+        remaining_bytes = MAX_BATCH_BYTES
+        for upload in files:
+            remaining = MAX_BATCH_FILES - len(items)
+            if remaining <= 0:
+                items.append((upload.filename, None, f"Batch exceeds {MAX_BATCH_FILES} PDFs"))
+                continue
+            content = await upload.read()
+            expanded = expand_uploads(upload.filename or "upload.pdf", content, remaining,
+                                      MAX_PDF_BYTES, remaining_bytes)
+            remaining_bytes -= sum(len(data) for _, data, _ in expanded if data is not None)
+            items.extend(expanded)
+    except BaseException:
+        worker_pools.release(reserved)
+        raise
     
-    # Step 7: Run original orchestrator (enhanced with new data)
-    print("🧠 Running career analysis orchestrator...")
-    ai_result = run_orchestrator(skills, frequency)
+    # Hand back what a small batch won't use
+    concurrency = max(1, min(reserved, len(items)))
+    worker_pools.release(reserved - concurrency)
     
-    # Step 8: Combine all analyses
-    print("✅ Analysis complete!")
+    async def stream():
+        succeeded = 0
+        async for line in run_batch(items, concurrency):
+            succeeded += "result" in line
+            yield json.dumps(line, default=str) + "\n"
+        yield json.dumps({"summary": {
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded
+        }}) + "\n"
     
-    return {
-        "detected_skills": skills,
-        "analysis": ai_result,
-        "project_analysis": project_analysis,
-        "capability_analysis": capability_analysis,
-        "resume_grade": resume_grade,
-        "sections_analyzed": {
-            "objective": sections['objective']['text'][:200] if sections['objective']['text'] else None,
-            "projects_count": len(sections['projects']),
-            "experience_count": len(sections['experience']),
-            "education": sections['education']
-        }
-    }
+    # The response owns the reservation: released when sending ends for any reason,
+    # including a client that disconnects before the first line
+    return worker_pools.streaming_response(stream(), concurrency, media_type="application/x-ndjson")
@@ -1,15 +1,20 @@
-from roles import ROLES
-from domain_map import DOMAIN_MAP
-from skill_weights import SKILL_WEIGHTS
+import os
+from taxonomy import get_taxonomy
+
+
+# Configuration
+ROLE_MATCH_TOP_K = int(os.getenv("ROLE_MATCH_TOP_K", "8"))  # roles kept in role_match_breakdown/_details
+ROLE_MATCH_WEIGHTED = os.getenv("ROLE_MATCH_WEIGHTED", "false").lower() == "true"  # overlap by skill weight
 
 
 # ---------------------------------
 # Rank skills by importance weight
 # ---------------------------------
-def rank_user_skills(user_skills):
+def rank_user_skills(user_skills, taxonomy=None):
+    taxonomy = taxonomy or get_taxonomy()
     return sorted(
         user_skills,
-        key=lambda x: SKILL_WEIGHTS.get(x, 5),
+        key=taxonomy.weight,
         reverse=True
     )
 
@@ -17,14 +22,15 @@ def rank_user_skills(user_skills):
 # ---------------------------------
 # Depth-aware general strength score
 # ---------------------------------
-def calculate_general_strength(user_skills, frequency):
+def calculate_general_strength(user_skills, frequency, taxonomy=None):
     if not user_skills:
         return 0
 
+    taxonomy = taxonomy or get_taxonomy()
     total = 0
 
     for skill in user_skills:
-        base_weight = SKILL_WEIGHTS.get(skill, 5)
+        base_weight = taxonomy.weight(skill)
         depth_multiplier = 1 + (frequency.get(skill, 1) * 0.2)
         total += base_weight * depth_multiplier
 
@@ -53,29 +59,25 @@ def calculate_skill_depth(frequency):
 # ---------------------------------
 # Role detection
 # ---------------------------------
-def detect_best_role(user_skills):
-    role_scores = {}
+def detect_best_role(user_skills, taxonomy=None):
+    taxonomy = taxonomy or get_taxonomy()
+    # Only roles sharing a skill are scored (inverted index); the best ROLE_MATCH_TOP_K are kept
+    matches = taxonomy.role_index.top_k(user_skills, ROLE_MATCH_TOP_K, ROLE_MATCH_WEIGHTED)
+    role_scores = {match['role']: match['score'] for match in matches}
 
-    for role, required in ROLES.items():
-        role_scores[role] = len(set(user_skills) & set(required))
+    # Safety: If no role shares a skill, return "General Software Engineer"
+    if not matches:
+        return "General Software Engineer", role_scores, matches
 
-    best_role = max(role_scores, key=role_scores.get)
-    
-    # Safety: If all scores are 0, return "General Software Engineer"
-    if role_scores[best_role] == 0:
-        return "General Software Engineer", role_scores
-
-    return best_role, role_scores
+    return matches[0]['role'], role_scores, matches
 
 
 # ---------------------------------
 # Domain detection
 # ---------------------------------
-def detect_strong_domain(user_skills):
-    domain_scores = {}
-
-    for domain, skills in DOMAIN_MAP.items():
-        domain_scores[domain] = len(set(user_skills) & set(skills))
+def detect_strong_domain(user_skills, taxonomy=None):
+    taxonomy = taxonomy or get_taxonomy()
+    domain_scores = dict(zip(taxonomy.domain_names, taxonomy.domain_hits(user_skills)))
 
     strongest_domain = max(domain_scores, key=domain_scores.get)
     
@@ -89,8 +91,8 @@ def detect_strong_domain(user_skills):
 # ---------------------------------
 # Missing skills for role
 # ---------------------------------
-def detect_missing_for_role(role, user_skills):
-    required = ROLES.get(role, [])
+def detect_missing_for_role(role, user_skills, taxonomy=None):
+    required = (taxonomy or get_taxonomy()).roles.get(role, [])
     return [skill for skill in required if skill not in user_skills]
 
 
@@ -113,8 +115,9 @@ def calculate_resume_complexity(user_skills):
 # ---------------------------------
 # Market alignment
 # ---------------------------------
-def calculate_market_alignment(user_skills):
-    score = sum(SKILL_WEIGHTS.get(skill, 5) for skill in user_skills)
+def calculate_market_alignment(user_skills, taxonomy=None):
+    taxonomy = taxonomy or get_taxonomy()
+    score = sum(taxonomy.weight(skill) for skill in user_skills)
     return min(int(score / 2.2), 95)
 
 
@@ -203,21 +206,37 @@ def detect_skill_synergy(domain_scores):
 # =================================
 # MASTER ENGINE
 # =================================
-def run_orchestrator(user_skills, frequency):
+def run_orchestrator(user_skills, frequency, taxonomy=None):
+    # Every stage reads the same taxonomy, even if a reload lands mid-report
+    taxonomy = taxonomy or get_taxonomy()
 
-    ranked_skills = rank_user_skills(user_skills)
+    general_strength = calculate_general_strength(user_skills, frequency, taxonomy)
 
-    general_strength = calculate_general_strength(user_skills, frequency)
-    skill_depth = calculate_skill_depth(frequency)
+    recommended_role, role_scores, role_matches = detect_best_role(user_skills, taxonomy)
+    strongest_domain, domain_scores = detect_strong_domain(user_skills, taxonomy)
+
+    market_alignment = calculate_market_alignment(user_skills, taxonomy)
+
+    return build_report(
+        user_skills, frequency, general_strength, market_alignment,
+        recommended_role, role_scores, strongest_domain, domain_scores, taxonomy, role_matches
+    )
 
-    recommended_role, role_scores = detect_best_role(user_skills)
-    strongest_domain, domain_scores = detect_strong_domain(user_skills)
 
-    missing_skills = detect_missing_for_role(recommended_role, user_skills)
+# ---------------------------------
+# Report assembly (shared by single and batch engines)
+# ---------------------------------
+def build_report(user_skills, frequency, general_strength, market_alignment,
+                 recommended_role, role_scores, strongest_domain, domain_scores, taxonomy=None,
+                 role_matches=None):
+
+    ranked_skills = rank_user_skills(user_skills, taxonomy)
+    skill_depth = calculate_skill_depth(frequency)
+
+    missing_skills = detect_missing_for_role(recommended_role, user_skills, taxonomy)
 
     roadmap = generate_roadmap(recommended_role, missing_skills)
     complexity = calculate_resume_complexity(user_skills)
-    market_alignment = calculate_market_alignment(user_skills)
     risk_index = calculate_risk_index(len(missing_skills))
     placement = placement_probability(general_strength)
     alignment_comment = career_alignment_analysis(strongest_domain, recommended_role)
@@ -245,6 +264,158 @@ def run_orchestrator(user_skills, frequency):
         "skill_synergy_analysis": synergy,
         "extraction_confidence": confidence,
         "role_match_breakdown": role_scores,
+        "role_match_details": role_matches or [],
         "domain_strength_breakdown": domain_scores,
         "roadmap": roadmap
     }
+
+
+# =================================
+# BATCH ENGINE (NumPy, imported on first batch)
+# =================================
+class SkillMatrices:
+    """
+    The taxonomy's roles, domains and weights encoded over one fixed skill vocabulary.
+    Skills outside the vocabulary touch no role or domain and weigh the default 5,
+    so they are carried as per-resume scalars instead of columns.
+    """
+
+    DEFAULT_WEIGHT = 5
+
+    def __init__(self, taxonomy):
+        import numpy as np
+        self.taxonomy = taxonomy
+        self.version = taxonomy.version
+        vocabulary = list(dict.fromkeys(
+            [skill for skills in taxonomy.roles.values() for skill in skills]
+            + list(taxonomy.domain_masks)
+            + list(taxonomy.weights)
+        ))
+        self.vocabulary = vocabulary
+        self.index = {skill: i for i, skill in enumerate(vocabulary)}
+
+        self.role_names = list(taxonomy.roles)
+        self.domain_names = taxonomy.domain_names
+        self.roles = self._membership(taxonomy.roles)
+        # Row d marks the skills whose domain mask has bit d, as detect_strong_domain counts them
+        masks = np.array([taxonomy.domain_masks.get(skill, 0) for skill in vocabulary], dtype=np.int64)
+        self.domains = (masks[None, :] >> np.arange(len(self.domain_names))[:, None]) & 1
+        self.weights = np.array([taxonomy.weight(skill) for skill in vocabulary], dtype=np.int64)
+
+    def _membership(self, groups):
+        import numpy as np
+        matrix = np.zeros((len(groups), len(self.vocabulary)), dtype=np.int64)
+        for row, skills in enumerate(groups.values()):
+            for skill in skills:
+                matrix[row, self.index[skill]] = 1
+        return matrix
+
+    def encode(self, batch):
+        """
+        Returns:
+            counts: (n, V) occurrences of each skill in the resume's skill list
+            freq: (n, V) mention frequency (default 1, as in the scalar engine)
+            oov_count, oov_freq, sizes: (n,) out-of-vocabulary totals and list lengths
+        """
+        import numpy as np
+        n, width = len(batch), len(self.vocabulary)
+        counts = np.zeros((n, width), dtype=np.int64)
+        freq = np.zeros((n, width), dtype=np.int64)
+        oov_count = np.zeros(n, dtype=np.int64)
+        oov_freq = np.zeros(n, dtype=np.int64)
+        sizes = np.zeros(n, dtype=np.int64)
+
+        for row, (user_skills, frequency) in enumerate(batch):
+            sizes[row] = len(user_skills)
+            for skill in user_skills:
+                f = frequency.get(skill, 1)
+                col = self.index.get(skill)
+                if col is None:
+                    oov_count[row] += 1
+                    oov_freq[row] += f
+                else:
+                    counts[row, col] += 1
+                    freq[row, col] = f
+
+        return counts, freq, oov_count, oov_freq, sizes
+
+
+_SKILL_MATRICES = None
+
+
+def get_skill_matrices(taxonomy=None):
+    """Matrices of the given (default: current) taxonomy, rebuilt after a taxonomy reload."""
+    global _SKILL_MATRICES
+    taxonomy = taxonomy or get_taxonomy()
+    if _SKILL_MATRICES is None or _SKILL_MATRICES.version != taxonomy.version:
+        _SKILL_MATRICES = SkillMatrices(taxonomy)
+    return _SKILL_MATRICES
+
+
+def run_orchestrator_batch(batch, taxonomy=None):
+    """
+    Score many resumes at once; output matches run_orchestrator() item by item.
+
+    Args:
+        batch: List of (user_skills, frequency) pairs
+        taxonomy: Taxonomy to score against (default: the current one, read once)
+
+    Returns:
+        List of orchestrator reports in input order
+    """
+    if not batch:
+        return []
+
+    import numpy as np
+    m = get_skill_matrices(taxonomy)
+    counts, freq, oov_count, oov_freq, sizes = m.encode(batch)
+    present = (counts > 0).astype(np.int64)
+
+    role_matrix = present @ (m.roles * m.weights if ROLE_MATCH_WEIGHTED else m.roles).T
+    domain_matrix = present @ m.domains.T
+
+    default = SkillMatrices.DEFAULT_WEIGHT
+    market = counts @ m.weights + default * oov_count
+    market_alignment = np.minimum((market / 2.2).astype(np.int64), 95)
+
+    # general strength = sum(w * (1 + 0.2 f)) / n * 2.5 = sum(w * (5 + f)) / 2n, exactly in integers
+    numerator = counts @ (5 * m.weights) + (counts * freq) @ m.weights + default * (5 * oov_count + oov_freq)
+    denominator = np.maximum(2 * sizes, 1)
+    general = np.minimum(numerator // denominator, 85)
+    general[sizes == 0] = 0
+    # An exactly-integral average is where the scalar float path can land a hair below and truncate;
+    # defer those rows to it so both engines agree bit for bit
+    ambiguous = np.flatnonzero((sizes > 0) & (numerator % denominator == 0))
+
+    # Top ROLE_MATCH_TOP_K roles with a nonzero score, best first, ties to the earlier role
+    ranked_roles = np.argsort(-role_matrix, axis=1, kind="stable")[:, :ROLE_MATCH_TOP_K]
+    best_domains = domain_matrix.argmax(axis=1)
+
+    general = general.tolist()
+    for row in ambiguous.tolist():
+        user_skills, frequency = batch[row]
+        general[row] = calculate_general_strength(user_skills, frequency, m.taxonomy)
+
+    reports = []
+    for row, (user_skills, frequency) in enumerate(batch):
+        owned = set(user_skills)
+        role_matches = [
+            m.taxonomy.role_index.match(col, score, owned)
+            for col, score in zip(ranked_roles[row].tolist(), role_matrix[row, ranked_roles[row]].tolist())
+            if score > 0
+        ]
+        role_scores = {match['role']: match['score'] for match in role_matches}
+        domain_scores = dict(zip(m.domain_names, domain_matrix[row].tolist()))
+
+        recommended_role = next(iter(role_scores), "General Software Engineer")
+
+        strongest_domain = m.domain_names[best_domains[row]]
+        if domain_scores[strongest_domain] == 0:
+            strongest_domain = "General Technology"
+
+        reports.append(build_report(
+            user_skills, frequency, general[row], int(market_alignment[row]),
+            recommended_role, role_scores, strongest_domain, domain_scores, m.taxonomy, role_matches
+        ))
+
+    return reports
@@ -0,0 +1,149 @@
+"""
+PDF Pre-Classifier
+Decides from the PDF structure alone (fonts, text operators, image placement) whether
+an upload has a usable text layer, so scanned resumes go straight to OCR instead of
+paying for two local extraction passes that can only fail.
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Tuple
+from upload_buffer import PdfSource, open_pdf_stream
+
+
+# A page needs at least this many text-showing operators to count as text
+MIN_TEXT_OPS = 3
+# Fraction of the page covered by images above which a text-less page is a scan
+IMAGE_COVERAGE_THRESHOLD = 0.4
+# Long documents are sampled evenly instead of inspected page by page
+MAX_SAMPLED_PAGES = 16
+
+TEXT_OP_PATTERN = re.compile(rb"(?:\)|>|\])\s*(?:Tj|TJ|'|\")")
+# "a b c d e f cm" (placement matrix) or "/Name Do" (draw XObject)
+NUMBER = rb"(-?\d*\.?\d+)"
+PLACEMENT_PATTERN = re.compile(
+    rb"(?:" + rb"\s+".join([NUMBER] * 6) + rb"\s+cm)|(?:/([^\s/\[\]()<>{}%]+)\s+Do)"
+)
+
+
+def _page_xobjects(page) -> Tuple[Dict[bytes, object], int]:
+    """Image/form XObjects by name, plus the number of fonts the page or form declares."""
+    resources = page.get("/Resources") or {}
+    if hasattr(resources, "get_object"):
+        resources = resources.get_object()
+    fonts = resources.get("/Font") or {}
+    xobjects = resources.get("/XObject") or {}
+    if hasattr(fonts, "get_object"):
+        fonts = fonts.get_object()
+    if hasattr(xobjects, "get_object"):
+        xobjects = xobjects.get_object()
+    named = {name[1:].encode("latin-1"): ref.get_object() for name, ref in xobjects.items()}
+    return named, len(fonts)
+
+
+def _content_bytes(page) -> bytes:
+    contents = page.get_contents()
+    return contents.get_data() if contents is not None else b""
+
+
+def inspect_page(page) -> Dict:
+    """Text-operator count, declared fonts and image coverage of one page."""
+    xobjects, fonts = _page_xobjects(page)
+    data = _content_bytes(page)
+    text_ops = len(TEXT_OP_PATTERN.findall(data))
+
+    width = float(page.mediabox.width) or 1.0
+    height = float(page.mediabox.height) or 1.0
+    image_area = 0.0
+    matrix = (1.0, 0.0, 0.0, 1.0)
+    for match in PLACEMENT_PATTERN.finditer(data):
+        if match.group(7) is None:
+            matrix = tuple(float(match.group(i)) for i in range(1, 5))
+            continue
+        xobject = xobjects.get(match.group(7))
+        if xobject is None:
+            continue
+        subtype = xobject.get("/Subtype")
+        if subtype == "/Image":
+            a, b, c, d = matrix
+            image_area += abs(a * d - b * c)
+        elif subtype == "/Form":
+            # Text drawn inside form XObjects (common in exported templates) still counts,
+            # and its fonts live in the form's own /Resources
+            text_ops += len(TEXT_OP_PATTERN.findall(xobject.get_data()))
+            fonts += _page_xobjects(xobject)[1]
+
+    return {
+        "text_ops": text_ops,
+        "fonts": fonts,
+        "image_coverage": min(1.0, image_area / (width * height))
+    }
+
+
+def classify_pdf(content: PdfSource) -> Dict:
+    """
+    Label a PDF as 'text' (every sampled page has a text layer), 'scanned' (none do,
+    and some are covered by images) or 'mixed'. 'unknown' when pypdf can't read the
+    structure or the text-less pages are blank or vector-only.
+
+    Returns:
+        Dict with label, pages, sampled_pages, text_pages, image_pages and classify_ms
+    """
+    started = time.perf_counter()
+    profile = {"label": "unknown", "pages": 0, "sampled_pages": 0, "text_pages": 0, "image_pages": 0}
+    try:
+        import pypdf
+        with open_pdf_stream(content) as stream:
+            reader = pypdf.PdfReader(stream)
+            page_count = len(reader.pages)
+            profile["pages"] = page_count
+
+            step = max(1, -(-page_count // MAX_SAMPLED_PAGES))
+            for index in range(0, page_count, step):
+                page = inspect_page(reader.pages[index])
+                profile["sampled_pages"] += 1
+                if page["fonts"] and page["text_ops"] >= MIN_TEXT_OPS:
+                    profile["text_pages"] += 1
+                elif page["image_coverage"] >= IMAGE_COVERAGE_THRESHOLD:
+                    profile["image_pages"] += 1
+
+        if profile["sampled_pages"]:
+            if profile["text_pages"] == profile["sampled_pages"]:
+                profile["label"] = "text"
+            elif profile["text_pages"] == 0:
+                # Blank or vector-only pages aren't evidence of a scan
+                profile["label"] = "scanned" if profile["image_pages"] else "unknown"
+            else:
+                profile["label"] = "mixed"
+    except Exception as e:
+        print(f"⚠️ PDF classification failed: {e}")
+
+    profile["classify_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return profile
+
+
+class ClassifierMetrics:
+    """Per-label counts and classification time, reported by /stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"text": 0, "scanned": 0, "mixed": 0, "unknown": 0}
+        self._total_ms = 0.0
+
+    def record(self, profile: Dict):
+        with self._lock:
+            self._counts[profile["label"]] = self._counts.get(profile["label"], 0) + 1
+            self._total_ms += profile.get("classify_ms", 0.0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                **self._counts,
+                "avg_classify_ms": round(self._total_ms / total, 2) if total else 0.0
+            }
+
+
+# Global instance
+classifier_metrics = ClassifierMetrics()
@@ -0,0 +1,394 @@
+"""
+Resume Analysis Pipeline
+Stage functions shared by the HTTP endpoints. Local stages are plain picklable
+functions so they can run in the CPU worker pool; network stages are awaited
+directly on the asyncio Gemini client.
+"""
+
+import asyncio
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from utils import extract_text_from_bytes, extract_text_from_bytes_checked, extract_text_parallel_checked, extract_page_range, split_pdf_pages, split_pdf_range
+from upload_buffer import PdfSource, UploadBuffer, source_bytes, source_size
+from pdf_classifier import classify_pdf, classifier_metrics
+import local_ocr
+from resume_document import ResumeDocument
+from orchestrator import run_orchestrator
+from section_extractor import SectionStream, extract_resume_sections
+from agents.project_agent import analyze_projects
+from agents.capability_agent import assess_capabilities
+from agents.ai_grading_agent import grade_resume_with_ai_checked_async
+from ai_client import get_async_ai_client
+from concurrency import worker_pools
+from sandbox import SandboxError
+from analysis_cache import analysis_cache
+
+
+# Configuration
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "500"))
+MAX_PDF_BYTES = int(os.getenv("MAX_PDF_BYTES", str(20 * 1024 * 1024)))
+# Decompressed PDF bytes one /analyze/batch request may hold in memory
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(512 * 1024 * 1024)))
+# Off (0) by default: on 2 workers page-parallel extraction measured slower up to 40 pages
+PARALLEL_EXTRACTION_MIN_PAGES = int(os.getenv("PARALLEL_EXTRACTION_MIN_PAGES", "0"))
+PAGE_TIMEOUT_SECONDS = float(os.getenv("PAGE_TIMEOUT_SECONDS", "10"))
+# A page whose own text layer is shorter than this is sent to AI OCR
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "40"))
+# Longer documents are OCR'd in page chunks so no single call hits the output token cap
+OCR_CHUNK_PAGES = int(os.getenv("OCR_CHUNK_PAGES", "4"))
+
+
+class ExtractionError(Exception):
+    """No usable text could be extracted from the upload."""
+
+
+# ---------------------------------
+# CPU stages (run in the process pool)
+# ---------------------------------
+def needs_ocr(text: Optional[str], skills: list) -> bool:
+    """Quality check: empty/short text or very few skills usually means a scanned PDF."""
+    return not text or len(text.strip()) < 50 or len(skills) < 3
+
+
+def analyze_text(text: str, document: Optional[ResumeDocument] = None,
+                 boundaries: Optional[Dict] = None) -> Dict:
+    """Run every local agent on the final resume text (boundaries: see extract_and_analyze)."""
+    document = document or ResumeDocument(text)
+
+    # Step 3: Extract structured sections (Now that we have best possible text)
+    print("📄 Extracting resume sections...")
+    sections = extract_resume_sections(document, boundaries)
+
+    # Step 4: Final skills come straight from the shared document
+    skills, frequency = document.skills, document.frequency
+
+    # Step 4: Analyze projects
+    print("🚀 Analyzing projects...")
+    project_analysis = analyze_projects(sections['projects'], document)
+
+    # Step 5: Assess capabilities
+    print("💪 Assessing skill capabilities...")
+    capability_analysis = assess_capabilities(project_analysis, frequency)
+
+    # Step 7: Run original orchestrator (enhanced with new data)
+    print("🧠 Running career analysis orchestrator...")
+    ai_result = run_orchestrator(skills, frequency, document.taxonomy)
+
+    return {
+        "text": text,
+        "detected_skills": skills,
+        "analysis": ai_result,
+        "project_analysis": project_analysis,
+        "capability_analysis": capability_analysis,
+        "taxonomy_version": document.taxonomy.version,
+        "sections_analyzed": {
+            "objective": sections['objective']['text'][:200] if sections['objective']['text'] else None,
+            "projects_count": len(sections['projects']),
+            "experience_count": len(sections['experience']),
+            "education": sections['education']
+        }
+    }
+
+
+def extract_and_analyze(content: PdfSource) -> Dict:
+    """
+    Local extraction, quality check and (when the text is good) full local analysis,
+    all inside one worker job so the document is tokenized once. Section headers are
+    scanned page by page while pypdf is still parsing, so the section map is ready
+    when extraction ends instead of costing another pass over the joined text.
+    """
+    sections = SectionStream()
+    text, from_pypdf, page_texts = extract_text_from_bytes_checked(
+        content, lambda page_text: sections.feed_page(page_text.lower())
+    )
+    if not from_pypdf:
+        # pypdfium2 text has different lines; let the extractor scan it
+        return analyze_extracted(text, page_texts=page_texts)
+    sections.close()
+    return analyze_extracted(text, sections.boundaries, page_texts)
+
+
+def analyze_extracted(text: Optional[str], boundaries: Optional[Dict] = None,
+                      page_texts: Optional[List[Optional[str]]] = None) -> Dict:
+    """
+    Quality check on extracted text, then full local analysis when it passes.
+    A failing result keeps page_texts so selective OCR needn't parse the PDF again.
+    """
+    # Step 2: Initial Skill Detection (one tokenization pass, shared by every agent)
+    print("🔍 Initial Skill Check...")
+    document = ResumeDocument(text) if text else None
+    skills = document.skills if document else []
+
+    if needs_ocr(text, skills):
+        print(f"⚠️  Quality Check Failed: TextLen={len(text) if text else 0}, Skills={len(skills)}")
+        return {"needs_ocr": True, "text": text, "page_texts": page_texts}
+
+    result = analyze_text(text, document, boundaries)
+    result["needs_ocr"] = False
+    return result
+
+
+async def extract_locally(content: PdfSource, page_count: int) -> Dict:
+    """
+    Short PDFs are extracted and analyzed in a single worker job; long ones are
+    split into page ranges across the whole CPU pool first (when enabled).
+    """
+    if (PARALLEL_EXTRACTION_MIN_PAGES <= 0 or page_count < max(2, PARALLEL_EXTRACTION_MIN_PAGES)
+            or worker_pools.cpu_workers < 2):
+        return await worker_pools.run_cpu(extract_and_analyze, content)
+
+    text, page_texts = await worker_pools.run_io(
+        extract_text_parallel_checked, content, worker_pools.cpu, worker_pools.cpu_workers,
+        page_count, PAGE_TIMEOUT_SECONDS
+    )
+    local = await worker_pools.run_cpu(analyze_extracted, text)
+    if local["needs_ocr"]:
+        local["page_texts"] = page_texts
+    return local
+
+
+# ---------------------------------
+# OCR and grading stages (awaited on the event loop)
+# ---------------------------------
+async def ocr_pdf(content: PdfSource, page_count: int, selective: bool = True,
+                  page_texts: Optional[List[Optional[str]]] = None) -> Optional[str]:
+    """
+    Local Tesseract first when the deployment selects it, Gemini as the last resort.
+    Gemini gets only the failing pages unless the document is known to be scanned;
+    page_texts (from local extraction) picks them without parsing the PDF again.
+    """
+    if local_ocr.is_available():
+        text = await worker_pools.run_io(
+            local_ocr.ocr_pdf_locally, content, worker_pools.cpu, worker_pools.cpu_workers,
+            page_count, local_ocr.OCR_PAGE_TIMEOUT_SECONDS
+        )
+        if text and len(text.strip()) >= 50:
+            return text
+        print("⚠️ Local OCR came up short, falling back to Gemini OCR")
+    if selective and page_count > 1:
+        return await ai_ocr_failing_pages(content, page_count, page_texts)
+    return await ai_ocr_document(content, page_count)
+
+
+async def ai_ocr_document(content: PdfSource, page_count: int) -> Optional[str]:
+    """
+    Gemini OCR of a whole document in OCR_CHUNK_PAGES chunks, all in flight at once
+    (the async client enforces the rate limit). A chunk whose output hit the token
+    cap is split in half and retried; chunks are stitched back with page markers.
+    """
+    ai = get_async_ai_client()
+    if page_count <= OCR_CHUNK_PAGES:
+        pdf_bytes = await worker_pools.run_io(source_bytes, content)
+        text, truncated = await ai.extract_text_from_pdf_checked(pdf_bytes)
+        if not truncated or page_count < 2:
+            return text
+        ranges = [(0, page_count // 2), (page_count // 2, page_count)]
+    else:
+        ranges = [(start, min(start + OCR_CHUNK_PAGES, page_count))
+                  for start in range(0, page_count, OCR_CHUNK_PAGES)]
+
+    async def ocr_range(start: int, stop: int) -> List[Tuple[int, int, Optional[str]]]:
+        part = await worker_pools.run_cpu(split_pdf_range, content, start, stop)
+        text, truncated = await ai.extract_text_from_pdf_checked(part)
+        if truncated and stop - start > 1:
+            middle = (start + stop) // 2
+            print(f"✂️ OCR of pages {start + 1}-{stop} was truncated, re-splitting")
+            halves = await asyncio.gather(ocr_range(start, middle), ocr_range(middle, stop))
+            return halves[0] + halves[1]
+        if truncated:
+            print(f"⚠️ OCR of page {start + 1} exceeds the output cap; keeping the partial text")
+        return [(start, stop, text)]
+
+    chunks = await asyncio.gather(*(ocr_range(start, stop) for start, stop in ranges))
+    pieces = []
+    for start, stop, text in (piece for chunk in chunks for piece in chunk):
+        if text:
+            label = f"page {start + 1}" if stop - start == 1 else f"pages {start + 1}-{stop}"
+            pieces.append(f"--- {label} ---\n{text}")
+    return "\n".join(pieces) or None
+
+
+async def ai_ocr_failing_pages(content: PdfSource, page_count: int,
+                               page_texts: Optional[List[Optional[str]]] = None) -> Optional[str]:
+    """
+    Gemini OCR for only the pages whose own text layer fails the quality check.
+    Failing pages are split out as single-page PDFs and OCR'd concurrently; every
+    other page keeps its local text, merged back in page order.
+    """
+    ai = get_async_ai_client()
+    if not ai.is_available():
+        print("⚠️  AI not available for OCR fallback")
+        return None
+    if page_texts is not None and len(page_texts) == page_count:
+        pages = list(page_texts)
+    else:
+        # Local extraction didn't finish every page; parse them here
+        pages = await worker_pools.run_cpu(extract_page_range, content, 0, page_count)
+    failing = [index for index, page_text in enumerate(pages)
+               if len((page_text or "").strip()) < OCR_MIN_PAGE_CHARS]
+
+    # Nothing to isolate (every page fails, or none does and the whole text is just thin)
+    if not failing or len(failing) == page_count:
+        return await ai_ocr_document(content, page_count)
+
+    parts = await worker_pools.run_cpu(split_pdf_pages, content, failing)
+    print(f"👁️ AI OCR for {len(failing)}/{page_count} pages "
+          f"({sum(len(part) for part in parts)} of {source_size(content)} bytes)")
+    ocr_texts = await asyncio.gather(*(ai.extract_text_from_pdf(part) for part in parts))
+
+    for index, ocr_text in zip(failing, ocr_texts):
+        if ocr_text:
+            pages[index] = ocr_text
+    text = "\n".join(page_text.strip() for page_text in pages if page_text and page_text.strip())
+    return text or None
+
+
+async def grade(local: Dict) -> Tuple[Dict, bool]:
+    """(grade, ai_graded): ai_graded is False when the rule-based fallback was used."""
+    print("🤖 AI-Powered Resume Grading...")
+    return await grade_resume_with_ai_checked_async(
+        resume_text=local["text"],
+        detected_skills=local["detected_skills"],
+        project_analysis=local["project_analysis"],
+        capability_analysis=local["capability_analysis"]
+    )
+
+
+# =================================
+# FULL PIPELINE
+# =================================
+async def run_analysis(upload: UploadBuffer) -> Dict:
+    """
+    Analyze one PDF without blocking the event loop. Every stage reads the same
+    upload buffer; worker processes get its path when it is spooled to disk.
+
+    Raises:
+        ExtractionError: if neither local extraction nor OCR produced usable text
+    """
+    # Repeat uploads of the same PDF skip extraction and the paid grading call
+    content = upload.source
+    content_hash = None
+    if analysis_cache is not None:
+        content_hash = await worker_pools.run_io(analysis_cache.content_hash, upload.view)
+        cached = await worker_pools.run_io(analysis_cache.get, analysis_cache.key(content_hash))
+        if cached is not None:
+            print("⚡ Analysis cache hit")
+            return cached
+
+    # Structure-only look at the PDF decides which extractor is worth running
+    try:
+        pdf_profile = await worker_pools.run_cpu(classify_pdf, content)
+    except SandboxError as e:
+        raise ExtractionError(f"This PDF could not be processed safely ({e}).")
+    classifier_metrics.record(pdf_profile)
+    print(f"🗂️ PDF classified as {pdf_profile['label']} ({pdf_profile['pages']} pages, {pdf_profile['classify_ms']}ms)")
+
+    # Scanned PDFs skip the local text extractors and go straight to OCR
+    local = None
+    if pdf_profile["label"] != "scanned":
+        try:
+            local = await extract_locally(content, pdf_profile["pages"])
+        except SandboxError as e:
+            raise ExtractionError(f"This PDF could not be processed safely ({e}).")
+
+    # AI OCR FALLBACK 👁️
+    ocr_succeeded = True
+    if local is None or local["needs_ocr"]:
+        ocr_succeeded = False
+        print("🔄 Attempting AI OCR fallback...")
+        text = local["text"] if local is not None else None
+        try:
+            ocr_text = await ocr_pdf(content, pdf_profile["pages"], selective=local is not None,
+                                     page_texts=local.get("page_texts") if local is not None else None)
+            if ocr_text:
+                text = ocr_text
+                ocr_succeeded = True
+                print(f"✅ Fallback to AI Text successful. New length: {len(text)}")
+            else:
+                print("⚠️ AI OCR returned None/Empty.")
+        except Exception as e:
+            print(f"❌ AI OCR Fallback failed: {e}")
+
+        # OCR unavailable on a document routed past local extraction: still try it
+        if not text and local is None:
+            try:
+                text = await worker_pools.run_cpu(extract_text_from_bytes, content)
+            except SandboxError as e:
+                raise ExtractionError(f"This PDF could not be processed safely ({e}).")
+
+        # Final check on text
+        if not text or len(text.strip()) < 10:
+            raise ExtractionError("Unable to extract text from resume. Please ensure it's a valid PDF.")
+
+        try:
+            local = await worker_pools.run_cpu(analyze_text, text)
+        except SandboxError as e:
+            raise ExtractionError(f"This resume could not be processed safely ({e}).")
+
+    # Step 6: AI-POWERED GRADING 🤖
+    resume_grade, ai_graded = await grade(local)
+
+    # Step 8: Combine all analyses
+    print("✅ Analysis complete!")
+
+    result = {
+        "detected_skills": local["detected_skills"],
+        "analysis": local["analysis"],
+        "project_analysis": local["project_analysis"],
+        "capability_analysis": local["capability_analysis"],
+        "resume_grade": resume_grade,
+        "sections_analyzed": local["sections_analyzed"],
+        "pdf_profile": pdf_profile
+    }
+
+    # Degraded results (fallback grade, failed OCR) are served but never cached,
+    # so the next upload of the same PDF gets another chance at the full analysis
+    if content_hash is not None and ai_graded and ocr_succeeded:
+        # Keyed by the taxonomy the analysis actually used, not the one at lookup time
+        cache_key = analysis_cache.key(content_hash, local["taxonomy_version"])
+        await worker_pools.run_io(analysis_cache.set, cache_key, result)
+    elif content_hash is not None:
+        print("⚠️ Degraded analysis (fallback grading or OCR); not cached")
+
+    return result
+
+
+# =================================
+# BATCH PIPELINE
+# =================================
+async def run_batch(items: List[Tuple[str, Optional[bytes], Optional[str]]],
+                    concurrency: int) -> AsyncIterator[Dict]:
+    """
+    Analyze many PDFs in parallel, yielding each result as soon as it finishes.
+    Failures are reported per item and never abort the batch.
+
+    Args:
+        items: (name, pdf_bytes, error) from utils.expand_uploads
+        concurrency: Max PDFs in the pipeline at once
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyze_item(index: int, name: str, content: Optional[bytes], error: Optional[str]) -> Dict:
+        if error:
+            return {"index": index, "filename": name, "error": error}
+        async with semaphore:
+            try:
+                with UploadBuffer.from_bytes(content) as upload:
+                    return {"index": index, "filename": name, "result": await run_analysis(upload)}
+            except ExtractionError as e:
+                return {"index": index, "filename": name, "error": str(e)}
+            except Exception as e:
+                print(f"❌ Batch item {name} failed: {e}")
+                return {"index": index, "filename": name, "error": f"Analysis failed: {e}"}
+
+    tasks = [
+        asyncio.create_task(analyze_item(index, name, content, error))
+        for index, (name, content, error) in enumerate(items)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away or the stream was closed early
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,91 @@
+"""
+Shared Resume Document
+Normalized text, line index and skill hits computed once per request and
+handed to every agent, so no stage has to rescan or re-lowercase the resume.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple, Union
+from taxonomy import Taxonomy, get_taxonomy
+
+
+class ResumeDocument:
+    """
+    One tokenization pass over the resume text.
+
+    Attributes:
+        text: Original text (case preserved for display/extraction)
+        lower: Normalized text; offsets line up 1:1 with text
+        lines: Stripped, non-empty lines (same list SectionExtractor works on)
+        line_spans: (start, end) character span of each entry in lines
+        skill_hits: (skill, start, end) for every skill match, sorted by start
+        frequency: Skill -> mention count
+        skills: Detected skills in order of first appearance
+        sections: Section name -> (start, end) character span, filled by SectionExtractor
+        taxonomy: The taxonomy the skills were matched with (one per request, even across a reload)
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = self._normalize(text)
+        self.lines, self.line_spans = self._index_lines()
+        self._line_starts = [start for start, _ in self.line_spans]
+
+        self.taxonomy: Taxonomy = get_taxonomy()
+        self.skill_hits = sorted(self.taxonomy.matcher.find_all(self.lower), key=lambda h: h[1])
+        self._hit_starts = [start for _, start, _ in self.skill_hits]
+
+        self.frequency: Dict[str, int] = {}
+        for skill, _, _ in self.skill_hits:
+            self.frequency[skill] = self.frequency.get(skill, 0) + 1
+        self.skills: List[str] = list(self.frequency)
+
+        self.sections: Dict[str, Tuple[int, int]] = {}
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        lower = text.lower()
+        if len(lower) == len(text):
+            return lower
+        # A few characters ("İ") grow when lowercased; keep them so offsets stay aligned
+        return ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+    def _index_lines(self) -> Tuple[List[str], List[Tuple[int, int]]]:
+        lines = []
+        spans = []
+        pos = 0
+        for raw in self.text.split('\n'):
+            stripped = raw.strip()
+            if stripped:
+                start = pos + (len(raw) - len(raw.lstrip()))
+                lines.append(stripped)
+                spans.append((start, start + len(stripped)))
+            pos += len(raw) + 1
+        return lines, spans
+
+    def span_of_lines(self, first: int, last: int) -> Tuple[int, int]:
+        """Character span covering lines[first:last] (empty span if the range is empty)."""
+        if first >= last or first >= len(self.line_spans):
+            return (0, 0)
+        return (self.line_spans[first][0], self.line_spans[min(last, len(self.line_spans)) - 1][1])
+
+    def line_at(self, offset: int) -> int:
+        """Index into lines of the last line starting at or before offset."""
+        return bisect_right(self._line_starts, offset) - 1
+
+    def hits_in_span(self, start: int, end: int) -> List[Tuple[str, int, int]]:
+        """Skill hits fully inside [start, end)."""
+        lo = bisect_left(self._hit_starts, start)
+        hi = bisect_left(self._hit_starts, end)
+        return [hit for hit in self.skill_hits[lo:hi] if hit[2] <= end]
+
+    def skills_in_span(self, start: int, end: int) -> List[str]:
+        """Unique skills inside [start, end) in order of first appearance."""
+        return list(dict.fromkeys(skill for skill, _, _ in self.hits_in_span(start, end)))
+
+
+def as_document(text: Union[str, 'ResumeDocument']) -> ResumeDocument:
+    """Accept either raw text or an existing document."""
+    if isinstance(text, ResumeDocument):
+        return text
+    return ResumeDocument(text or '')
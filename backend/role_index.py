@@ -0,0 +1,98 @@
+"""
+Inverted Role Index
+Skill -> roles postings over the role catalog, so matching a resume only touches
+the roles that share a skill with it. Per-request cost follows the candidate's
+skills and their postings, not the number of roles in the catalog. Below
+ROLE_INDEX_MIN_ROLES roles a plain scan over the catalog is cheaper and is used
+instead; both give the same matches.
+"""
+
+import heapq
+import os
+from typing import Callable, Dict, Iterable, List, Sequence
+
+
+# Configuration
+ROLE_INDEX_MIN_ROLES = int(os.getenv("ROLE_INDEX_MIN_ROLES", "12"))  # smaller catalogs are scanned
+
+
+class RoleIndex:
+    """
+    Attributes:
+        role_names: Roles in catalog order (ties go to the earlier role)
+        role_skills: Required skills of each role
+        postings: Skill -> IDs of the roles requiring it
+    """
+
+    def __init__(self, role_names: List[str], role_skills: List[List[str]],
+                 postings: Dict[str, Sequence[int]], weight: Callable[[str], int],
+                 min_roles: int = ROLE_INDEX_MIN_ROLES):
+        self.role_names = role_names
+        self.role_skills = role_skills
+        self.postings = postings
+        self.weight = weight
+        self.min_roles = min_roles
+
+    @classmethod
+    def from_roles(cls, roles: Dict[str, List[str]], weight: Callable[[str], int],
+                   min_roles: int = ROLE_INDEX_MIN_ROLES) -> "RoleIndex":
+        postings: Dict[str, List[int]] = {}
+        for role_id, skills in enumerate(roles.values()):
+            for skill in dict.fromkeys(skills):
+                postings.setdefault(skill, []).append(role_id)
+        return cls(list(roles), [list(dict.fromkeys(s)) for s in roles.values()], postings, weight, min_roles)
+
+    def __len__(self) -> int:
+        return len(self.role_names)
+
+    def scores(self, user_skills: Iterable[str], weighted: bool = False) -> Dict[int, int]:
+        """
+        Overlap of the candidate's skills with every role sharing at least one.
+        Unweighted: number of distinct shared skills. Weighted: sum of their weights.
+        """
+        scores: Dict[int, int] = {}
+        for skill in dict.fromkeys(user_skills):
+            role_ids = self.postings.get(skill)
+            if role_ids is None:
+                continue
+            points = self.weight(skill) if weighted else 1
+            for role_id in role_ids:
+                scores[role_id] = scores.get(role_id, 0) + points
+        return scores
+
+    def scan(self, user_skills: Iterable[str], weighted: bool = False) -> Dict[int, int]:
+        """The same overlaps as scores(), by intersecting the skills with every role."""
+        owned = set(user_skills)
+        scores: Dict[int, int] = {}
+        for role_id, required in enumerate(self.role_skills):
+            shared = owned.intersection(required)
+            if shared:
+                scores[role_id] = sum(map(self.weight, shared)) if weighted else len(shared)
+        return scores
+
+    def match(self, role_id: int, score: int, owned: set) -> Dict:
+        """Match breakdown of one role for a candidate owning the given skills."""
+        required = self.role_skills[role_id]
+        matched = [skill for skill in required if skill in owned]
+        return {
+            'role': self.role_names[role_id],
+            'score': score,
+            'matched_skills': matched,
+            'required_count': len(required),
+            'coverage': round(len(matched) / len(required), 2)
+        }
+
+    def top_k(self, user_skills: Iterable[str], k: int = 5, weighted: bool = False) -> List[Dict]:
+        """
+        The k best-matching roles, best first, each with its match breakdown.
+        Roles sharing no skill are never returned.
+        """
+        user_skills = list(dict.fromkeys(user_skills))
+        if len(self) < self.min_roles:
+            scores = self.scan(user_skills, weighted)
+        else:
+            scores = self.scores(user_skills, weighted)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+        owned = set(user_skills)
+        return [self.match(role_id, score, owned) for role_id, score in best]
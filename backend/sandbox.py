@@ -0,0 +1,276 @@
+"""
+Sandboxed Worker Pool
+Pre-forked worker subprocesses for parsing untrusted PDFs. Each worker runs under
+address-space and CPU-time rlimits, every job has a hard wall-clock timeout, and
+workers are recycled after a fixed number of jobs. A decompression bomb or a
+pathological page costs one worker restart, never the uvicorn process.
+
+Implements concurrent.futures.Executor, so it drops in wherever the process pool
+was used (asyncio run_in_executor, utils.map_page_ranges).
+"""
+
+import math
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from typing import Dict
+
+try:
+    import resource  # POSIX only; without rlimits there is no sandbox to offer
+except ImportError:
+    resource = None
+
+
+# Configuration
+SANDBOX_ENABLED = os.getenv("SANDBOX_ENABLED", "true").lower() == "true" and resource is not None
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "2048"))  # address space per worker
+SANDBOX_CPU_SECONDS = int(os.getenv("SANDBOX_CPU_SECONDS", "30"))  # CPU time per job
+SANDBOX_JOB_TIMEOUT_SECONDS = float(os.getenv("SANDBOX_JOB_TIMEOUT_SECONDS", "60"))  # wall clock per job
+SANDBOX_MAX_JOBS = int(os.getenv("SANDBOX_MAX_JOBS", "200"))  # recycle after this many jobs
+SANDBOX_START_METHOD = os.getenv("SANDBOX_START_METHOD", "forkserver")
+
+# Modules the fork server imports once, so every (re)started worker is warm.
+# Heavy libraries are listed explicitly: the app itself only imports them on first use.
+PRELOAD_MODULES = ["pipeline", "pypdf", "pypdfium2", "numpy"]
+
+
+class SandboxError(Exception):
+    """A job was killed (timeout) or its worker died (rlimit, crash)."""
+
+
+class SandboxTimeout(SandboxError):
+    """A job exceeded the wall-clock timeout and its worker was killed."""
+
+
+def _apply_limits(memory_mb: int):
+    if memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _limit_cpu(cpu_seconds: int):
+    """RLIMIT_CPU counts the worker's whole life, so move the soft limit per job."""
+    if cpu_seconds <= 0:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + cpu_seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, memory_mb: int, cpu_seconds: int):
+    """Worker loop: receive (fn, args, cpu_seconds or None), reply (ok, result_or_exception)."""
+    _apply_limits(memory_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        fn, args, job_cpu_seconds = job
+        _limit_cpu(job_cpu_seconds or cpu_seconds)
+        try:
+            reply = (True, fn(*args))
+        except BaseException as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Result or exception wasn't picklable
+            conn.send((False, SandboxError(f"{type(e).__name__}: {e}")))
+        if not reply[0] and isinstance(reply[1], MemoryError):
+            return  # heap may be fragmented past the limit; let the pool start a fresh worker
+
+
+class _Worker:
+    """One sandboxed subprocess and the pipe to it."""
+
+    def __init__(self, context, memory_mb: int, cpu_seconds: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_mb, cpu_seconds), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self, kill: bool = False):
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1 if not kill else None)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SandboxPool(Executor):
+    """Fixed set of sandboxed workers, one dispatcher thread each."""
+
+    def __init__(self, max_workers: int,
+                 memory_mb: int = SANDBOX_MEMORY_MB,
+                 cpu_seconds: int = SANDBOX_CPU_SECONDS,
+                 job_timeout: float = SANDBOX_JOB_TIMEOUT_SECONDS,
+                 max_jobs: int = SANDBOX_MAX_JOBS,
+                 start_method: str = SANDBOX_START_METHOD):
+        self.max_workers = max_workers
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.job_timeout = job_timeout
+        self.max_jobs = max_jobs
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self._context.set_forkserver_preload(PRELOAD_MODULES)
+        self._jobs: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._shutdown = False
+        self._lock = threading.Lock()
+        self._counters = {"jobs": 0, "timeouts": 0, "crashes": 0, "recycled": 0, "restarts": 0}
+
+        # Pre-fork every worker now so the first requests don't pay for start-up
+        self._workers = [self._start_worker() for _ in range(max_workers)]
+        self._threads = [
+            threading.Thread(target=self._dispatch, args=(slot,), name=f"kapp-sandbox-{slot}", daemon=True)
+            for slot in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(self._context, self.memory_mb, self.cpu_seconds)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        if kwargs:
+            raise TypeError("SandboxPool.submit does not take keyword arguments")
+        return self.submit_with_timeout(None, fn, *args)
+
+    def submit_with_timeout(self, timeout, fn, *args) -> Future:
+        """
+        submit() with this job's own wall-clock budget instead of job_timeout (None
+        keeps the default). The CPU rlimit scales with it, so a long multi-page
+        job isn't killed for CPU before its wall clock runs out.
+        """
+        if self._shutdown:
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        future = Future()
+        self._jobs.put((future, fn, args, timeout))
+        return future
+
+    def _dispatch(self, slot: int):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            future, fn, args, timeout = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            worker = self._workers[slot]
+            if worker is None or not worker.process.is_alive():
+                worker = self._respawn(slot)
+                if worker is None:
+                    # Shutting down: queued jobs fail instead of killing this thread
+                    future.set_exception(SandboxError("sandbox pool is shut down"))
+                    continue
+
+            self._count("jobs")
+            try:
+                outcome = self._run(worker, fn, args, timeout or self.job_timeout)
+            except Exception as e:
+                # Never let one bad job take the dispatcher thread down with it
+                outcome = (False, e)
+            if isinstance(outcome, SandboxError):
+                worker.stop(kill=True)
+                self._respawn(slot)
+                future.set_exception(outcome)
+                continue
+
+            ok, value = outcome
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+            worker.jobs += 1
+            if worker.jobs >= self.max_jobs or not worker.process.is_alive():
+                worker.stop()
+                self._count("recycled")
+                self._respawn(slot)
+
+    def _respawn(self, slot: int):
+        """Replace the worker in a slot right away so the next job finds it warm."""
+        if self._shutdown:
+            self._workers[slot] = None
+            return None
+        self._workers[slot] = self._start_worker()
+        self._count("restarts")
+        return self._workers[slot]
+
+    def _run(self, worker: _Worker, fn, args, timeout: float):
+        """(ok, value) from the worker, or a SandboxError if it had to be killed."""
+        name = getattr(fn, "__name__", "job")
+        cpu_seconds = None
+        if timeout > self.job_timeout and self.cpu_seconds > 0:
+            cpu_seconds = math.ceil(self.cpu_seconds * timeout / self.job_timeout)
+        try:
+            try:
+                worker.conn.send((fn, args, cpu_seconds))
+            except (EOFError, OSError):
+                raise
+            except Exception as e:
+                return (False, e)  # job not picklable; nothing was sent
+            if not worker.conn.poll(timeout):
+                self._count("timeouts")
+                print(f"⏱️ Sandboxed {name} exceeded {timeout:g}s; killing worker")
+                return SandboxTimeout(f"{name} timed out after {timeout:g}s")
+            return worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+            self._count("crashes")
+            code = worker.process.exitcode
+            print(f"💥 Sandboxed {name} worker died (exit code {code})")
+            return SandboxError(f"{name} worker died (exit code {code})")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "memory_mb": self.memory_mb,
+                "cpu_seconds": self.cpu_seconds,
+                "job_timeout": self.job_timeout,
+                "max_jobs": self.max_jobs
+            }
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._shutdown = True
+        if cancel_futures:
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job[0].cancel()
+        for _ in self._threads:
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        for slot, worker in enumerate(self._workers):
+            if worker is not None:
+                worker.stop(kill=not wait)
+                self._workers[slot] = None
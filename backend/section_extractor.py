@@ -1,5 +1,6 @@
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+from resume_document import ResumeDocument, as_document
 
 
 class SectionExtractor:
@@ -8,21 +9,45 @@ class SectionExtractor:
     Handles messy, unstructured resumes with multiple formats.
     """
     
-    # Section header patterns (case-insensitive, flexible)
+    # Section header patterns (case-insensitive). The classifier is anchored to the
+    # start of the line, so each pattern spells out a whole header phrase.
     SECTION_PATTERNS = {
-        'objective': r'(?:objective|summary|profile|about\s*me|professional\s*summary|career\s*objective)',
-        'projects': r'(?:projects?|portfolio|work\s*samples?|personal\s*projects?)',
-        'experience': r'(?:experience|work\s*history|employment|professional\s*experience|work\s*experience)',
-        'education': r'(?:education|academic|qualifications?|degrees?)',
-        'skills': r'(?:skills?|technical\s*skills?|technologies|competencies)',
+        'objective': r'(?:career\s*objective|objective|professional\s*summary|summary(?:\s+of\s+qualifications)?|profile|about\s*me)',
+        'projects': r'(?:(?:personal|academic|key|selected|major|notable|side)\s+)?(?:projects?|portfolio|work\s*samples?)',
+        'experience': r'(?:(?:professional|work|relevant|industry)\s+)?experience|work\s*history|employment(?:\s+history)?',
+        'education': r'(?:education(?:al\s+background)?|academic(?:\s+(?:background|qualifications?|details))?|qualifications?|degrees?)',
+        'skills': r'(?:(?:technical|core|key|professional)\s+)?(?:skills?|technologies|competencies)',
         'certifications': r'(?:certifications?|certificates?|licenses?)',
-        'achievements': r'(?:achievements?|awards?|accomplishments?|honors?)'
+        'achievements': r'(?:(?:academic\s+|key\s+)?achievements?|awards?|accomplishments?|honors?)'
     }
     
-    def __init__(self, text: str):
-        self.text = text.lower()
-        self.original_text = text  # Keep case for extraction
-        self.lines = [line.strip() for line in text.split('\n') if line.strip()]
+    # Header heuristics
+    MAX_HEADER_CHARS = 48       # "TECHNICAL SKILLS & TOOLS:" fits, sentences don't
+    MAX_TAIL_WORDS = 3          # after the keyword: "& tools", "and interests", "(selected)"
+    # Keywords that still open a section with content on the same line ("Skills: Python, SQL");
+    # others ("Technologies: React, Node" inside a project) are detail lines
+    INLINE_KEYWORDS = {'summary', 'objective', 'profile', 'skills'}
+    
+    # Optional numbering/markup before the keyword ("2.", "iv)", "##"); bullets don't qualify
+    HEADER_PREFIX = r'\s*(?:#+\s*|(?:\d{1,2}|[ivx]{1,4})[.)]\s*)?'
+    # What may follow the keyword: end of line, a colon, or a connector to a short tail
+    HEADER_END = r'(?=\s*(?:$|[:(&/,|\-–—]|and\b))'
+    
+    # One pass per line: named alternation, the group that matched is the section
+    HEADER_PATTERN = re.compile(
+        HEADER_PREFIX
+        + '(?:' + '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SECTION_PATTERNS.items()) + ')'
+        + HEADER_END,
+        re.IGNORECASE
+    )
+    
+    def __init__(self, text: Union[str, ResumeDocument],
+                 boundaries: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.document = as_document(text)
+        self.boundaries = boundaries  # from a SectionStream fed during extraction
+        self.text = self.document.lower
+        self.original_text = self.document.text  # Keep case for extraction
+        self.lines = self.document.lines
         
     def extract_all_sections(self) -> Dict:
         """Extract all sections from resume."""
@@ -34,14 +59,17 @@ class SectionExtractor:
         # Extract each section
         for section_name, (start, end) in section_indices.items():
             sections[section_name] = self._extract_section_content(start, end)
+            self.document.sections[section_name] = self.document.span_of_lines(start, end)
         
         # Parse projects
-        projects_data = self._parse_projects(sections.get('projects', ''))
+        projects_start = section_indices.get('projects', (None, None))[0]
+        projects_data = self._parse_projects(sections.get('projects', ''), projects_start)
         
         # CRITICAL FIX: If no projects, extract from experience bullets
         # Essential for SAP ABAP/Enterprise professionals
         if not projects_data or len(projects_data) == 0:
-            projects_data = self._extract_projects_from_experience(sections.get('experience', ''))
+            experience_start = section_indices.get('experience', (None, None))[0]
+            projects_data = self._extract_projects_from_experience(sections.get('experience', ''), experience_start)
         
         # Parse structured data from sections
         return {
@@ -57,25 +85,46 @@ class SectionExtractor:
     
     def _find_section_boundaries(self) -> Dict[str, Tuple[int, int]]:
         """Find start and end line indices for each section."""
-        boundaries = {}
-        section_starts = []
-        
-        # Find all section headers
-        for i, line in enumerate(self.lines):
-            for section_name, pattern in self.SECTION_PATTERNS.items():
-                if re.search(pattern, line.lower()):
-                    section_starts.append((i, section_name))
-                    break
-        
-        # Calculate boundaries
-        for i, (start, name) in enumerate(section_starts):
-            if i < len(section_starts) - 1:
-                end = section_starts[i + 1][0]
-            else:
-                end = len(self.lines)
-            boundaries[name] = (start + 1, end)  # +1 to skip header
-        
-        return boundaries
+        if self.boundaries is not None:
+            return self.boundaries
+        stream = SectionStream(cased=self.text != self.original_text)
+        
+        # Each header closes the section before it; a later duplicate wins
+        for line in self.lines:
+            stream.feed(line)
+        stream.close()
+        
+        return stream.boundaries
+    
+    @classmethod
+    def classify_header(cls, line: str, cased: bool = False) -> Optional[str]:
+        """
+        Section name if the line is a section header, else None.
+        
+        A header starts with a section keyword (position), is short (length) and has
+        at most a colon or a short connector tail after the keyword. When the resume
+        kept its original case, an all-lowercase line is prose, not a header (casing).
+        
+        Args:
+            line: One stripped line
+            cased: Whether the resume text is in its original case
+        """
+        match = cls.HEADER_PATTERN.match(line)
+        if match is None:
+            return None
+        name = match.lastgroup
+        tail = line[match.end():].strip()
+        
+        if tail.startswith(':') and tail[1:].strip():
+            keyword = match.group(name).split()[-1].lower()
+            return name if keyword in cls.INLINE_KEYWORDS else None
+        if len(line) > cls.MAX_HEADER_CHARS or line.endswith('.'):
+            return None
+        if cased and line == line.lower():
+            return None
+        if len(tail.rstrip(':').split()) > cls.MAX_TAIL_WORDS:
+            return None
+        return name
     
     def _extract_section_content(self, start: int, end: int) -> str:
         """Extract text content between line indices."""
@@ -110,10 +159,15 @@ class SectionExtractor:
             'passion_signals': passion_signals
         }
     
-    def _parse_projects(self, text: str) -> List[Dict]:
+    def _parse_projects(self, text: str, first_line: Optional[int] = None) -> List[Dict]:
         """
         Parse projects with advanced pattern matching.
         Handles various formats: bullet points, paragraphs, mixed.
+        
+        Args:
+            text: Projects section content
+            first_line: Index into self.lines where the section starts; when given,
+                        each project carries a 'span' into the shared document
         """
         if not text:
             return []
@@ -123,7 +177,7 @@ class SectionExtractor:
         
         lines = text.split('\n')
         
-        for line in lines:
+        for offset, line in enumerate(lines):
             line = line.strip()
             if not line:
                 continue
@@ -139,13 +193,14 @@ class SectionExtractor:
             if is_title and current_project:
                 # Save previous project
                 projects.append(current_project)
-                current_project = {'title': line, 'description': '', 'technologies': []}
+                current_project = {'title': line, 'description': '', 'technologies': [], 'lines': [offset, offset + 1]}
             elif is_title:
                 # Start new project
-                current_project = {'title': line, 'description': '', 'technologies': []}
+                current_project = {'title': line, 'description': '', 'technologies': [], 'lines': [offset, offset + 1]}
             elif current_project:
                 # Add to description
                 current_project['description'] += line + ' '
+                current_project['lines'][1] = offset + 1
         
         # Save last project
         if current_project:
@@ -153,7 +208,12 @@ class SectionExtractor:
         
         # If no projects detected, treat entire text as single project
         if not projects and text:
-            projects = [{'title': 'Project', 'description': text, 'technologies': []}]
+            projects = [{'title': 'Project', 'description': text, 'technologies': [], 'lines': [0, len(lines)]}]
+        
+        for project in projects:
+            first, last = project.pop('lines')
+            if first_line is not None:
+                project['span'] = self.document.span_of_lines(first_line + first, first_line + last)
         
         # Extract technologies from descriptions
         for project in projects:
@@ -211,7 +271,7 @@ class SectionExtractor:
         skills = re.split(r'[,;|•\n]', text)
         return [s.strip() for s in skills if s.strip() and len(s.strip()) > 1]
     
-    def _extract_projects_from_experience(self, text: str) -> List[Dict]:
+    def _extract_projects_from_experience(self, text: str, first_line: Optional[int] = None) -> List[Dict]:
         """
         CRITICAL FALLBACK: Extract pseudo-projects from experience bullet points.
         Essential for SAP ABAP, enterprise professionals who list deliverables as bullets.
@@ -222,7 +282,7 @@ class SectionExtractor:
         projects = []
         lines = text.split('\n')
         
-        for line in lines:
+        for offset, line in enumerate(lines):
             line = line.strip()
             
             # Skip empty lines and short headers
@@ -238,11 +298,14 @@ class SectionExtractor:
             title_match = re.match(r'^([^.!?]{10,80})', line)
             title = title_match.group(1).strip() if title_match else line[:60]
             
-            projects.append({
+            project = {
                 'title': title,
                 'description': line,
                 'technologies': self._extract_technologies_from_text(line)
-            })
+            }
+            if first_line is not None:
+                project['span'] = self.document.span_of_lines(first_line + offset, first_line + offset + 1)
+            projects.append(project)
         
         # Limit to max 10 most substantial projects
         projects.sort(key=lambda x: len(x['description']), reverse=True)
@@ -267,7 +330,70 @@ class SectionExtractor:
         return list(set(found))
 
 
-def extract_resume_sections(text: str) -> Dict:
-    """Main function to extract all sections from resume text."""
-    extractor = SectionExtractor(text)
+class SectionStream:
+    """
+    Incremental header scan. Lines are fed one at a time, or a page at a time while
+    a PDF is still being extracted, and each section is reported as soon as the next
+    header, or the end of the document, closes it. Line indices count stripped,
+    non-empty lines, the same as ResumeDocument.lines.
+    
+    Attributes:
+        boundaries: Section name -> (start, end) line span of every closed section;
+            a later duplicate header wins
+    """
+    
+    def __init__(self, cased: bool = False):
+        self.cased = cased
+        self.line_count = 0
+        self.boundaries: Dict[str, Tuple[int, int]] = {}
+        self._open: Optional[Tuple[str, int]] = None  # (name, first content line)
+    
+    def feed(self, line: str) -> Optional[Tuple[str, int, int]]:
+        """
+        Add the next stripped, non-empty line.
+        
+        Returns:
+            (name, start, end) of the section this line closed, if it is a header
+        """
+        index = self.line_count
+        self.line_count += 1
+        name = SectionExtractor.classify_header(line, self.cased)
+        if name is None:
+            return None
+        closed = self._close(index)
+        self._open = (name, index + 1)  # +1 to skip header
+        return closed
+    
+    def feed_page(self, text: str) -> List[Tuple[str, int, int]]:
+        """Add every line of a page of text; returns the sections it closed."""
+        closed = []
+        for raw in text.split('\n'):
+            line = raw.strip()
+            if line:
+                section = self.feed(line)
+                if section:
+                    closed.append(section)
+        return closed
+    
+    def close(self) -> Optional[Tuple[str, int, int]]:
+        """End of document: (name, start, end) of the last open section, if any."""
+        closed = self._close(self.line_count)
+        self._open = None
+        return closed
+    
+    def _close(self, end: int) -> Optional[Tuple[str, int, int]]:
+        if self._open is None:
+            return None
+        name, start = self._open
+        self.boundaries[name] = (start, end)
+        return name, start, end
+
+
+def extract_resume_sections(text: Union[str, ResumeDocument],
+                            boundaries: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict:
+    """
+    Main function to extract all sections from resume text (or a shared ResumeDocument).
+    boundaries: SectionStream.boundaries already scanned over the same lines, if any.
+    """
+    extractor = SectionExtractor(text, boundaries)
     return extractor.extract_all_sections()
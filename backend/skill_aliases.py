@@ -0,0 +1,25 @@
+SKILL_ALIASES = {
+    # canonical name: other spellings of the same skill
+    "nodejs": ["node", "node.js"],
+    "nest.js": ["nestjs"],
+    "react": ["reactjs", "react.js"],
+    "vue": ["vuejs", "vue.js"],
+    "angularjs": ["angular.js"],
+    "next.js": ["nextjs"],
+    "nuxt": ["nuxt.js"],
+    "go": ["golang"],
+    "postgresql": ["postgres"],
+    "kubernetes": ["k8s"],
+    "scikit-learn": ["sklearn"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "nlp": ["natural language processing"],
+    "f#": ["fsharp"],
+    "mssql": ["sql server", "microsoft sql server"],
+    "rails": ["ruby on rails"],
+    "material-ui": ["mui"],
+    "html": ["html5"],
+    "css": ["css3"]
+}
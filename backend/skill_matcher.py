@@ -0,0 +1,182 @@
+"""
+Compiled Skill Matcher
+Aho-Corasick automaton that finds every taxonomy phrase in one pass over the text.
+The taxonomy's matcher is prebuilt into the taxonomy artifact (see taxonomy.py).
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Characters that glue a phrase to its neighbours ("c" inside "c++", "go" inside "google")
+WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_+#")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch in WORD_CHARS or (ch.isalnum() and not ch.isascii())
+
+
+class PhraseMatcher:
+    """
+    Multi-pattern matcher built once from a phrase list.
+    Matches are word-boundary aware: a phrase edge that is a word character must not
+    touch another word character in the text, so "r" never matches inside "docker"
+    and "java" never matches inside "javascript". Edges that are punctuation
+    (".net", "c++") are matched as-is.
+
+    With canonical, matches report the canonical name of each phrase instead, so
+    alias spellings ("node.js", "nodejs") count as one skill. With bounded=False,
+    phrases match anywhere, as plain substrings ("team" inside "teams").
+    """
+
+    def __init__(self, phrases: Iterable[str], canonical: Optional[Dict[str, str]] = None,
+                 bounded: bool = True):
+        self.bounded = bounded
+        self.phrases: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+        for phrase in phrases:
+            key = phrase.lower().strip()
+            if key and key not in self._ids:
+                self._ids[key] = len(self.phrases)
+                self.phrases.append(key)
+        self._index_phrases(canonical)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def _index_phrases(self, canonical: Optional[Dict[str, str]]):
+        self.names = [canonical.get(p, p) for p in self.phrases] if canonical else self.phrases
+        self._aliased = self.names != self.phrases
+        self._lengths = [len(p) for p in self.phrases]
+        self._left_bounded = [self.bounded and _is_word_char(p[0]) for p in self.phrases]
+        self._right_bounded = [self.bounded and _is_word_char(p[-1]) for p in self.phrases]
+
+    @classmethod
+    def from_tables(cls, phrases: List[str], names: List[str], tables: Dict[str, List[int]]) -> "PhraseMatcher":
+        """Rebuild a matcher from to_tables() output without redoing the failure links."""
+        self = cls.__new__(cls)
+        self.bounded = True
+        self.phrases = phrases
+        self._ids = {phrase: pid for pid, phrase in enumerate(phrases)}
+        self._index_phrases(dict(zip(phrases, names)))
+
+        offsets, chars, targets = tables["goto_offsets"], tables["goto_chars"], tables["goto_targets"]
+        self._goto = [
+            {chr(ch): nxt for ch, nxt in zip(chars[offsets[s]:offsets[s + 1]], targets[offsets[s]:offsets[s + 1]])}
+            for s in range(len(offsets) - 1)
+        ]
+        self._fail = list(tables["fail"])
+        offsets, pids = tables["out_offsets"], tables["out_phrases"]
+        self._out = [tuple(pids[offsets[s]:offsets[s + 1]]) for s in range(len(offsets) - 1)]
+        return self
+
+    def to_tables(self) -> Dict[str, List[int]]:
+        """The automaton as flat int lists: goto edges and outputs per state (CSR), failure links."""
+        tables = {"goto_offsets": [0], "goto_chars": [], "goto_targets": [], "out_offsets": [0], "out_phrases": []}
+        for edges, out in zip(self._goto, self._out):
+            tables["goto_chars"].extend(ord(ch) for ch in edges)
+            tables["goto_targets"].extend(edges.values())
+            tables["goto_offsets"].append(len(tables["goto_chars"]))
+            tables["out_phrases"].extend(out)
+            tables["out_offsets"].append(len(tables["out_phrases"]))
+        tables["fail"] = list(self._fail)
+        return tables
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def _build(self):
+        """Build the trie, then the failure links breadth-first."""
+        goto, fail, out = self._goto, self._fail, self._out
+
+        for pid, phrase in enumerate(self.phrases):
+            state = 0
+            for ch in phrase:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    fail.append(0)
+                    out.append(())
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state] = out[state] + (pid,)
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                # Inherit every phrase that is a suffix of this one
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+    def find_all(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Scan text once and return every bounded match.
+
+        Returns:
+            List of (phrase, start, end) tuples in order of their end offset; phrase
+            is the canonical name when the matcher has aliases. Offsets index into
+            text.lower(), which is identical to the input for already-normalized
+            resume text.
+        """
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        lengths, phrases = self._lengths, self.names
+        left_bounded, right_bounded = self._left_bounded, self._right_bounded
+        size = len(text)
+
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            if out[state]:
+                end = i + 1
+                for pid in out[state]:
+                    start = end - lengths[pid]
+                    if left_bounded[pid] and start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if right_bounded[pid] and end < size and _is_word_char(text[end]):
+                        continue
+                    hits.append((phrases[pid], start, end))
+
+        return self._merge_aliases(hits) if self._aliased else hits
+
+    @staticmethod
+    def _merge_aliases(hits: List[Tuple[str, int, int]]) -> List[Tuple[str, int, int]]:
+        """Overlapping spellings of one skill ("node" inside "node.js") are one mention; keep the longest."""
+        kept: List[Optional[Tuple[str, int, int]]] = []
+        last: Dict[str, int] = {}  # name -> index of its latest kept hit
+        for hit in hits:
+            name, start, end = hit
+            i = last.get(name)
+            if i is not None and start < kept[i][2]:
+                if start > kept[i][1] or end - start <= kept[i][2] - kept[i][1]:
+                    continue
+                kept[i] = None
+            last[name] = len(kept)
+            kept.append(hit)
+        return [hit for hit in kept if hit is not None]
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Frequency of every matched phrase."""
+        frequency = {}
+        for phrase, _, _ in self.find_all(text):
+            frequency[phrase] = frequency.get(phrase, 0) + 1
+        return frequency
+
+
+def match_skills(text: str) -> List[Tuple[str, int, int]]:
+    """Find every skill in text with its character offsets."""
+    from taxonomy import get_taxonomy
+    return get_taxonomy().matcher.find_all(text)
@@ -12,5 +12,6 @@ SKILL_WEIGHTS = {
     "microservices": 15,
     "nodejs": 15,
     "static code analysis": 14,
-    "unit testing": 14
+    "unit testing": 14,
+    "flask": 8
 }
@@ -0,0 +1,113 @@
+"""
+Startup Warm-up
+Render instances sleep when idle, so every wake-up is a cold start. Heavy libraries
+(google-genai, pypdf, pypdfium2) are imported on first use; the lifespan hook can
+pay for them before the first request instead: it builds the Gemini client,
+pre-starts the CPU workers and has each one open a PDF and match skills once.
+
+Import time, warm-up time and time-to-first-response are reported by /stats.
+Import this module first in main.py so the import clock starts with the app.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+PROCESS_STARTED = time.perf_counter()
+
+
+# Configuration
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "60"))
+
+SAMPLE_RESUME = "python developer with react, docker, aws and postgresql experience"
+
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+class StartupMetrics:
+    """Cold-start timings, reported by /stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.import_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.first_response: Optional[Dict] = None
+
+    def record_import(self):
+        self.import_ms = _elapsed_ms(PROCESS_STARTED)
+        print(f"⏱️ App imported in {self.import_ms:g} ms")
+
+    def record_warmup(self, started: float):
+        self.warmup_ms = _elapsed_ms(started)
+        print(f"🔥 Warm-up finished in {self.warmup_ms:g} ms")
+
+    def record_response(self, path: str, started: float):
+        """Keep the first response served: when it went out and how long it took."""
+        if self.first_response is not None:
+            return
+        with self._lock:
+            if self.first_response is None:
+                self.first_response = {
+                    "path": path,
+                    "since_start_ms": _elapsed_ms(PROCESS_STARTED),
+                    "latency_ms": _elapsed_ms(started)
+                }
+                print(f"🚀 First response ({path}) {self.first_response['since_start_ms']:g} ms after start")
+
+    def stats(self) -> Dict:
+        return {
+            "import_ms": self.import_ms,
+            "warmup_ms": self.warmup_ms,
+            "first_response": self.first_response
+        }
+
+
+def warm_worker() -> int:
+    """
+    Load the PDF parsers and matchers in a CPU worker (picklable entry point).
+    Returns the worker's pid.
+    """
+    import io
+    import pypdf
+    from utils import pdf_page_count, extract_text_pdfium
+    from resume_document import ResumeDocument
+    from orchestrator import get_skill_matrices
+
+    writer = pypdf.PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    blank = buffer.getvalue()
+    pdf_page_count(blank)
+    extract_text_pdfium(blank)
+
+    ResumeDocument(SAMPLE_RESUME)  # runs the skill phrase matcher once
+    get_skill_matrices()
+    return os.getpid()
+
+
+async def warm_up(pools) -> None:
+    """
+    Build the Gemini client and warm every CPU worker. Failures are logged and
+    ignored; the lazy paths still work, just slower on the first request.
+    """
+    from ai_client import get_async_ai_client
+
+    started = time.perf_counter()
+    try:
+        await pools.run_io(get_async_ai_client)
+        jobs = [pools.run_cpu(warm_worker) for _ in range(pools.cpu_workers)]
+        pids = await asyncio.wait_for(asyncio.gather(*jobs), WARMUP_TIMEOUT_SECONDS)
+        print(f"🔥 Warmed {len(set(pids))}/{pools.cpu_workers} CPU workers")
+    except Exception as e:
+        print(f"⚠️ Warm-up incomplete: {e}")
+    startup_metrics.record_warmup(started)
+
+
+# Global instance
+startup_metrics = StartupMetrics()
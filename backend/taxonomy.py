@@ -0,0 +1,384 @@
+"""
+Compiled Taxonomy
+Skills, aliases, weights, roles and domains compiled into one artifact: canonical
+skills with integer IDs, the prebuilt skill matcher tables, the skill -> role
+postings of the role index, and a content hash of it all as the version. Build it with `python taxonomy.py build`.
+
+The app maps the artifact read-only and checks it for changes at most every
+TAXONOMY_RELOAD_SECONDS, so a rebuilt taxonomy reaches the server and every CPU
+worker without a restart. The Python tables (skills.py, skill_aliases.py,
+skill_weights.py, roles.py, domain_map.py) stay the editable source; without an
+artifact they are compiled in memory on first use.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from skill_matcher import PhraseMatcher
+from role_index import RoleIndex
+
+
+# Configuration
+TAXONOMY_PATH = os.getenv("TAXONOMY_PATH", os.path.join(os.path.dirname(__file__), "taxonomy.kapp"))
+TAXONOMY_RELOAD_SECONDS = float(os.getenv("TAXONOMY_RELOAD_SECONDS", "5"))  # 0 = load once, never check
+
+DEFAULT_WEIGHT = 5
+
+# Artifact layout: header | meta JSON | padding to 4 bytes | int32 arrays in ARRAYS order.
+# The version is the SHA-256 (first 16 hex digits) of everything after the header.
+MAGIC = b"KAPPTAX2"
+HEADER = struct.Struct("<8s16sI")  # magic, version, meta length
+ARRAYS = ("phrase_skill", "weights", "skill_domains", "role_offsets", "role_postings",
+          "goto_offsets", "goto_chars", "goto_targets", "fail", "out_offsets", "out_phrases")
+
+
+# ---------------------------------
+# Build
+# ---------------------------------
+def load_sources() -> Dict:
+    """The editable Python tables the artifact is compiled from."""
+    from skills import SKILLS_LIST
+    from skill_aliases import SKILL_ALIASES
+    from skill_weights import SKILL_WEIGHTS
+    from roles import ROLES
+    from domain_map import DOMAIN_MAP
+    return {
+        "skills": SKILLS_LIST,
+        "aliases": SKILL_ALIASES,
+        "weights": SKILL_WEIGHTS,
+        "roles": ROLES,
+        "domains": DOMAIN_MAP
+    }
+
+
+def source_hash(sources: Dict) -> str:
+    payload = json.dumps(sources, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def compile_taxonomy(sources: Optional[Dict] = None) -> bytes:
+    """
+    Canonicalize and deduplicate the source tables and serialize them, with the
+    prebuilt matcher, into artifact bytes.
+
+    Raises:
+        ValueError: Two spellings of one skill carry different weights
+    """
+    sources = sources or load_sources()
+
+    def key(skill: str) -> str:
+        return skill.lower().strip()
+
+    canonical = {}
+    for name, aliases in sources["aliases"].items():
+        for alias in aliases:
+            canonical[key(alias)] = key(name)
+
+    def canon(skill: str) -> str:
+        return canonical.get(key(skill), key(skill))
+
+    # Skill IDs: detectable skills first, in taxonomy order, then skills only the scoring tables name
+    ids: Dict[str, int] = {}
+
+    def intern(skill: str) -> int:
+        return ids.setdefault(canon(skill), len(ids))
+
+    for skill in sources["skills"]:
+        intern(skill)
+    # An alias of a detectable skill is matched too, and reported under the canonical name
+    phrases = list(dict.fromkeys(
+        [key(s) for s in sources["skills"]]
+        + [key(alias) for name, aliases in sources["aliases"].items() if canon(name) in ids for alias in aliases]
+    ))
+    phrases = [p for p in phrases if p]
+    matcher = PhraseMatcher(phrases, {phrase: canon(phrase) for phrase in phrases})
+
+    weights: Dict[int, int] = {}
+    for skill, weight in sources["weights"].items():
+        skill_id = intern(skill)
+        if skill_id in weights and weights[skill_id] != weight:
+            raise ValueError(f"Conflicting weights for {canon(skill)!r}: {weights[skill_id]} and {weight}")
+        weights[skill_id] = weight
+    roles = {role: list(dict.fromkeys(intern(skill) for skill in skills))
+             for role, skills in sources["roles"].items()}
+    domain_names = list(sources["domains"])
+    domain_masks: Dict[int, int] = {}
+    for bit, skills in enumerate(sources["domains"].values()):
+        for skill in skills:
+            skill_id = intern(skill)
+            domain_masks[skill_id] = domain_masks.get(skill_id, 0) | (1 << bit)
+
+    # Inverted role index: roles requiring each skill ID, as CSR over skill IDs
+    postings: Dict[int, List[int]] = {}
+    for role_id, skill_ids in enumerate(roles.values()):
+        for skill_id in skill_ids:
+            postings.setdefault(skill_id, []).append(role_id)
+
+    skills = list(ids)
+    role_offsets = [0]
+    role_postings: List[int] = []
+    for skill_id in range(len(skills)):
+        role_postings.extend(postings.get(skill_id, ()))
+        role_offsets.append(len(role_postings))
+    arrays = {
+        "phrase_skill": [ids[name] for name in matcher.names],
+        "weights": [weights.get(i, 0) for i in range(len(skills))],  # 0 = no explicit weight
+        "skill_domains": [domain_masks.get(i, 0) for i in range(len(skills))],
+        "role_offsets": role_offsets,
+        "role_postings": role_postings,
+        **matcher.to_tables()
+    }
+    meta = {
+        "skills": skills,
+        "phrases": matcher.phrases,
+        "roles": roles,
+        "domain_names": domain_names,
+        "default_weight": DEFAULT_WEIGHT,
+        "source_hash": source_hash(sources),
+        "byteorder": sys.byteorder,
+        "arrays": {name: len(arrays[name]) for name in ARRAYS}
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+    body = meta_bytes + b"\0" * (-len(meta_bytes) % 4)
+    body += b"".join(array("i", arrays[name]).tobytes() for name in ARRAYS)
+    version = hashlib.sha256(body).hexdigest()[:16]
+    return HEADER.pack(MAGIC, version.encode(), len(meta_bytes)) + body
+
+
+def build_taxonomy(path: str = TAXONOMY_PATH) -> "Taxonomy":
+    """Compile the sources and atomically replace the artifact at path."""
+    content = compile_taxonomy()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(content)
+        os.chmod(tmp_path, 0o644)
+        # Readers either see the old file or the whole new one
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return load_taxonomy(path)
+
+
+# ---------------------------------
+# Load
+# ---------------------------------
+class Taxonomy:
+    """
+    One compiled taxonomy over artifact bytes (a read-only memory map when loaded
+    from a file). The int32 tables stay NumPy views over those bytes, shared
+    through the page cache by every process mapping the same artifact; only the
+    indexes the per-request code walks in pure Python are decoded into objects.
+
+    Attributes:
+        version: Content hash of the artifact
+        source: Artifact path, or "sources" when compiled in memory
+        arrays: Table name -> read-only int32 view over the artifact (see ARRAYS)
+        skills: Canonical skill names; a skill's ID is its index
+        ids: Canonical skill name -> ID
+        matcher: PhraseMatcher reporting canonical names (its automaton is decoded)
+        weights: Skill -> explicit importance weight
+        roles: Role -> required skills
+        role_index: Inverted skill -> roles index; postings are memoryviews into role_postings
+        domain_names: Domains in bit order of domain_masks
+        domains: Domain -> skills
+        domain_masks: Skill -> domain bitmask (bit i = domain_names[i])
+    """
+
+    def __init__(self, buffer, source: str):
+        import numpy as np
+        with memoryview(buffer) as view:
+            magic, version, meta_length = HEADER.unpack_from(view, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{source} is not a taxonomy artifact")
+            with view[HEADER.size:] as body:
+                if hashlib.sha256(body).hexdigest()[:16] != version.decode():
+                    raise ValueError(f"{source} is corrupt (content hash mismatch)")
+            meta = json.loads(bytes(view[HEADER.size:HEADER.size + meta_length]))
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"{source} was built on a {meta['byteorder']}-endian machine; rebuild it")
+
+        # Views keep the buffer (and a file's mapping) alive for as long as they are used
+        self.arrays = {}
+        offset = HEADER.size + meta_length + (-meta_length % 4)
+        for name in ARRAYS:
+            count = meta["arrays"][name]
+            self.arrays[name] = np.frombuffer(buffer, dtype=np.int32, count=count, offset=offset)
+            offset += 4 * count
+        arrays = self.arrays
+
+        self.version = version.decode()
+        self.source = source
+        self.built_from = meta["source_hash"]
+        self.skills: List[str] = meta["skills"]
+        self.ids: Dict[str, int] = {skill: i for i, skill in enumerate(self.skills)}
+
+        # The matcher walks its automaton per character in Python, so it gets Python tables
+        names = [self.skills[i] for i in arrays["phrase_skill"].tolist()]
+        matcher_tables = {name: arrays[name].tolist() for name in
+                          ("goto_offsets", "goto_chars", "goto_targets", "fail", "out_offsets", "out_phrases")}
+        self.matcher = PhraseMatcher.from_tables(meta["phrases"], names, matcher_tables)
+
+        self.default_weight = meta["default_weight"]
+        self.weights: Dict[str, int] = {
+            self.skills[i]: int(arrays["weights"][i]) for i in np.flatnonzero(arrays["weights"]).tolist()
+        }
+        self.roles: Dict[str, List[str]] = {
+            role: [self.skills[i] for i in skill_ids] for role, skill_ids in meta["roles"].items()
+        }
+        # Memoryview slices iterate as Python ints without copying
+        offsets, role_ids = arrays["role_offsets"].tolist(), memoryview(arrays["role_postings"])
+        self.role_index = RoleIndex(
+            list(self.roles), list(self.roles.values()),
+            {skill: role_ids[offsets[i]:offsets[i + 1]]
+             for i, skill in enumerate(self.skills) if offsets[i] < offsets[i + 1]},
+            self.weight
+        )
+        self.domain_names: List[str] = meta["domain_names"]
+        self.domain_masks: Dict[str, int] = {
+            self.skills[i]: int(arrays["skill_domains"][i])
+            for i in np.flatnonzero(arrays["skill_domains"]).tolist()
+        }
+        self.domains: Dict[str, List[str]] = {
+            domain: [skill for skill, mask in self.domain_masks.items() if mask >> bit & 1]
+            for bit, domain in enumerate(self.domain_names)
+        }
+
+    def weight(self, skill: str) -> int:
+        return self.weights.get(skill, self.default_weight)
+
+    def domain_hits(self, skills: Iterable[str]) -> List[int]:
+        """Number of distinct skills in each domain, in domain_names order."""
+        hits = [0] * len(self.domain_names)
+        for skill in dict.fromkeys(skills):
+            mask = self.domain_masks.get(skill, 0)
+            while mask:
+                low = mask & -mask
+                hits[low.bit_length() - 1] += 1
+                mask ^= low
+        return hits
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "skills": len(self.skills),
+            "phrases": len(self.matcher),
+            "roles": len(self.roles),
+            "domains": len(self.domain_names)
+        }
+
+
+def load_taxonomy(path: str) -> Taxonomy:
+    """
+    Map the artifact read-only and decode it in place. The mapping lives as long as
+    the taxonomy does. Windows can't replace a mapped file, so a rebuild there would
+    fail while the server runs; it reads the bytes instead.
+    """
+    with open(path, "rb") as f:
+        if os.name == "nt":
+            return Taxonomy(f.read(), path)
+        return Taxonomy(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path)
+
+
+class TaxonomyStore:
+    """
+    The live taxonomy of this process. The artifact's (mtime, size, inode) is
+    checked at most every reload_seconds; a changed file is loaded and swapped in.
+    A bad artifact is reported and the current taxonomy kept.
+    """
+
+    def __init__(self, path: str, reload_seconds: float):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._current: Optional[Taxonomy] = None
+        self._signature: Optional[Tuple] = None
+        self._checked = 0.0
+        self.reloads = 0
+        self.errors = 0
+
+    def get(self) -> Taxonomy:
+        current = self._current
+        if current is not None and (self.reload_seconds <= 0
+                                    or time.monotonic() - self._checked < self.reload_seconds):
+            return current
+        with self._lock:
+            if self._current is None or (self.reload_seconds > 0
+                                         and time.monotonic() - self._checked >= self.reload_seconds):
+                self._refresh()
+            return self._current
+
+    def _file_signature(self) -> Optional[Tuple]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh(self):
+        self._checked = time.monotonic()
+        signature = self._file_signature()
+        if self._current is not None and signature == self._signature:
+            return
+        self._signature = signature
+
+        if signature is None:
+            if self._current is None:
+                self._current = Taxonomy(compile_taxonomy(), "sources")
+                print(f"📚 No taxonomy artifact at {self.path}; compiled from source tables "
+                      f"(version {self._current.version})")
+            return
+
+        try:
+            taxonomy = load_taxonomy(self.path)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Could not load taxonomy artifact {self.path}: {e}")
+            if self._current is None:
+                self._current = Taxonomy(compile_taxonomy(), "sources")
+            return
+
+        if taxonomy.built_from != source_hash(load_sources()):
+            print(f"⚠️ Taxonomy artifact was built from different source tables; "
+                  f"run `python taxonomy.py build` to refresh it")
+        if self._current is not None and taxonomy.version != self._current.version:
+            self.reloads += 1
+            print(f"🔄 Taxonomy reloaded: {self._current.version} → {taxonomy.version}")
+        self._current = taxonomy
+
+    def stats(self) -> Dict:
+        return {**self.get().stats(), "reloads": self.reloads, "errors": self.errors}
+
+
+# Global instance
+taxonomy_store = TaxonomyStore(TAXONOMY_PATH, TAXONOMY_RELOAD_SECONDS)
+
+
+def get_taxonomy() -> Taxonomy:
+    """The current taxonomy; cheap enough to call per use."""
+    return taxonomy_store.get()
+
+
+def taxonomy_version() -> str:
+    return get_taxonomy().version
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("Usage: python taxonomy.py build [path]")
+        sys.exit(2)
+    built = build_taxonomy(sys.argv[2] if len(sys.argv) > 2 else TAXONOMY_PATH)
+    print(f"📚 Built taxonomy {built.version}: {len(built.skills)} skills, "
+          f"{len(built.matcher)} phrases → {built.source}")
@@ -0,0 +1,49 @@
+"""
+Project Indicator Scoring Test
+Locks in the scores of the original substring indicator checks, so plurals and
+inflections ("teams", "two awards", "integration tests") keep counting.
+Run: python -m pytest test_project_scoring.py
+"""
+
+from agents.project_agent import ProjectAnalyzer
+
+
+def score(description):
+    analyzer = ProjectAnalyzer([], description)
+    project = analyzer._analyze_single_project({'title': '', 'description': description})
+    return project['complexity_score'], project['impact_score'], project['role_type'], project['role_score']
+
+
+def test_plural_test_indicators():
+    # 'unit test' and 'integration test' both fire on their plural forms
+    assert score("Built unit tests and integration tests for the api") == (3.6, 1.0, 'Developer', 4)
+
+
+def test_plural_award():
+    assert score("won two awards for the app") == (1.0, 3.2, 'Developer', 4)
+
+
+def test_plural_team():
+    assert score("worked with teams across the company") == (1.0, 1.0, 'Team Contributor', 5)
+
+
+def test_substring_indicators():
+    # "led" inside "called" and "team" inside "steam" counted in the original checks too
+    assert score("Called the service; steam engine simulator") == (1.0, 1.0, 'Tech Lead', 16)
+
+
+def test_leadership_and_metrics():
+    text = "led a group of 5 and mentored interns, deployed to production with 10k users and 30% improvement"
+    assert score(text) == (2.8, 9.2, 'Tech Lead', 19)
+
+
+def test_solo_project():
+    text = "personal project: created and developed a tutorial app in 2024"
+    assert score(text) == (1.0, 1.0, 'Solo Developer', 11)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,148 @@
+"""
+Upload Buffer
+One read-only copy of an uploaded PDF for the whole request. Small uploads stay as
+bytes; large ones are spooled to a temp file once and memory-mapped, and worker
+processes get the path (not a pickled copy), so every extractor reads the same pages
+of the OS page cache.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from typing import BinaryIO, Optional, Union
+from fastapi import UploadFile
+
+
+# Configuration
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None  # default: system temp dir
+READ_CHUNK_BYTES = 1024 * 1024
+
+# What extractors accept: the PDF bytes, or the path of a spooled upload
+PdfSource = Union[bytes, str]
+
+
+def open_pdf_stream(source: PdfSource) -> BinaryIO:
+    """Seekable read-only stream over a source without copying it (BytesIO shares bytes, files are mmapped)."""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return io.BytesIO(source)
+
+
+def open_pdfium_document(source: PdfSource) -> "pdfium.PdfDocument":
+    """pdfium reads spooled files natively; bytes go through a stream as before."""
+    import pypdfium2 as pdfium
+    if isinstance(source, str):
+        return pdfium.PdfDocument(source)
+    return pdfium.PdfDocument(io.BytesIO(source))
+
+
+def source_bytes(source: PdfSource) -> bytes:
+    """The PDF as bytes (a copy for spooled files; only for APIs that need bytes)."""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    return source
+
+
+def source_size(source: PdfSource) -> int:
+    return os.path.getsize(source) if isinstance(source, str) else len(source)
+
+
+class UploadBuffer:
+    """
+    An upload held either in memory or in a spooled temp file.
+
+    Attributes:
+        source: What to hand to extractors and worker processes (bytes or path)
+        size: Length in bytes
+    """
+
+    def __init__(self, data: bytes = b"", path: Optional[str] = None):
+        self._data = data
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+
+    @classmethod
+    async def from_upload(cls, upload: UploadFile, spool_bytes: int = UPLOAD_SPOOL_BYTES) -> "UploadBuffer":
+        """Read an UploadFile once, straight to disk when it is (or turns out to be) large."""
+        if upload.size is not None and upload.size <= spool_bytes:
+            return cls(await upload.read())
+
+        fd, path = tempfile.mkstemp(prefix="kapp-upload-", suffix=".pdf", dir=UPLOAD_SPOOL_DIR)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = await upload.read(READ_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return cls._from_spooled(path, spool_bytes)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, spool_bytes: int = UPLOAD_SPOOL_BYTES) -> "UploadBuffer":
+        """Wrap bytes already in memory (e.g. a zip member), spooling them if large."""
+        if len(data) <= spool_bytes:
+            return cls(data)
+        fd, path = tempfile.mkstemp(prefix="kapp-upload-", suffix=".pdf", dir=UPLOAD_SPOOL_DIR)
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        return cls(path=path)
+
+    @classmethod
+    def _from_spooled(cls, path: str, spool_bytes: int) -> "UploadBuffer":
+        if os.path.getsize(path) > spool_bytes:
+            return cls(path=path)
+        # Size wasn't known up front and the file is small after all
+        with open(path, "rb") as f:
+            data = f.read()
+        os.remove(path)
+        return cls(data)
+
+    @property
+    def source(self) -> PdfSource:
+        return self.path if self.path is not None else self._data
+
+    @property
+    def size(self) -> int:
+        return source_size(self.source)
+
+    @property
+    def view(self) -> memoryview:
+        """Zero-copy read-only view for in-process consumers (hashing, sniffing)."""
+        if self.path is None:
+            return memoryview(self._data)
+        if self._map is None:
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)
+
+    def sha256(self) -> str:
+        return hashlib.sha256(self.view).hexdigest()
+
+    def close(self):
+        """Drop the mapping and delete the spooled file."""
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # a view is still exported; the mapping goes with it
+            self._map = None
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __enter__(self) -> "UploadBuffer":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,20 +1,14 @@
 import io
 import re
-from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+import time
+import zipfile
+import zlib
+from contextlib import closing
+from concurrent.futures import Executor, Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Iterator, List, Tuple, Dict, Optional
 from fastapi import UploadFile
-import pypdf
-import pdfplumber
-import pypdfium2 as pdfium
-from pdfminer.high_level import extract_text as pdfminer_extract
-from skills import SKILLS_LIST
-
-
-# 🔥 Hardcode Tesseract location (bypass PATH issues)
-# pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-
-# 🔥 Set local Poppler path (for pdf2image)
-# POPPLER_PATH = Path(__file__).parent / "poppler" / "poppler-24.08.0" / "Library" / "bin"
+from taxonomy import get_taxonomy
+from upload_buffer import PdfSource, open_pdf_stream, open_pdfium_document
 
 
 def _clean_text(text: str) -> str:
@@ -31,71 +25,333 @@ def extract_text(file: UploadFile) -> Optional[str]:
     Returns:
         Cleaned text string or None if extraction fails.
     """
+    content = file.file.read()
+    file.file.seek(0)  # Reset pointer for subsequent reads
+    return extract_text_from_bytes(content)
+
+
+def extract_text_from_bytes(content: PdfSource) -> Optional[str]:
+    """
+    Same as extract_text, but takes the raw PDF bytes (or the path of a spooled
+    upload, which is memory-mapped instead of copied).
+    Picklable entry point for the CPU worker pool.
+    """
+    return extract_text_from_bytes_checked(content)[0]
+
+
+def extract_text_from_bytes_checked(content: PdfSource, on_page: Optional[Callable[[str], None]] = None
+                                    ) -> Tuple[Optional[str], bool, Optional[List[str]]]:
+    """
+    extract_text_from_bytes that hands each non-empty pypdf page to on_page as soon
+    as it is parsed (e.g. the streaming section scan).
+    
+    Returns:
+        (text, from_pypdf, page_texts): from_pypdf is False when the text came from
+        the pypdfium2 fallback, i.e. the pages on_page saw were discarded; page_texts
+        is pypdf's raw text of every page, or None if pypdf failed partway
+    """
+    page_texts: Optional[List[str]] = []
     try:
-        # Read file content
-        content = file.file.read()
-        file.file.seek(0)  # Reset pointer for subsequent reads
-        
-        text = ""
-        
-        # Method 1: PyPDF2 (Standard Text Extraction)
+        # Method 1: PyPDF2 (Standard Text Extraction), page by page
+        pages: List[str] = []
         try:
-            pdf_reader = pypdf.PdfReader(io.BytesIO(content))
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
+            for page_text in iter_page_texts(content):
+                page_texts.append(page_text)
                 if page_text:
-                    text += page_text + "\n"
-            
-            # If we got a good amount of text, return it
-            if len(text.strip()) > 100:
-                print("✅ Extracted text using PyPDF2")
-                return _clean_text(text)
-                
+                    pages.append(page_text + "\n")
+                    if on_page is not None:
+                        on_page(page_text)
         except Exception as e:
+            # A partial text layer would look complete to the length check below
             print(f"⚠️ PyPDF2 extraction failed: {e}")
+            pages = []
+            page_texts = None
+        text = "".join(pages)
+        
+        # If we got a good amount of text, return it
+        if len(text.strip()) > 100:
+            print("✅ Extracted text using PyPDF2")
+            return _clean_text(text), True, page_texts
 
         # Method 2: pypdfium2 (Robust Layout/Text Extraction)
+        from_pypdf = True
         try:
             print("🔄 Attempting backup extraction with pypdfium2...")
-            
-            # Use pypdfium2 to render text
-            pdf = pdfium.PdfDocument(io.BytesIO(content))
-            text = ""
-            for i in range(len(pdf)):
-                page = pdf[i]
-                textpage = page.get_textpage()
-                text += textpage.get_text_bounded() + "\n"
+            text = extract_text_pdfium(content)
+            from_pypdf = False
             
             if len(text.strip()) > 50:
                 print("✅ Extracted text using pypdfium2")
-                return _clean_text(text)
+                return _clean_text(text), False, page_texts
                 
         except Exception as e:
              print(f"⚠️ pypdfium2 extraction failed: {e}")
 
         # Final check
         if not text.strip():
-             return None
+             return None, False, page_texts
              
-        return _clean_text(text)
+        return _clean_text(text), from_pypdf, page_texts
 
     except Exception as e:
         print(f"❌ Critical Error in text extraction: {e}")
-        return None
+        return None, False, None
 
 
-def extract_skills(text):
+def pdfium_page_text(pdf, index: int) -> str:
+    """
+    Text of one pypdfium2 page. The page and its text page are closed before
+    returning, so native memory is freed now rather than whenever the GC runs.
+    """
+    with closing(pdf[index]) as page, closing(page.get_textpage()) as textpage:
+        return textpage.get_text_bounded()
 
-    detected = set()
-    frequency = {}
 
-    for skill in SKILLS_LIST:
-        count = text.count(skill.lower())
-        if count > 0:
-            detected.add(skill)
-            frequency[skill] = count
+def iter_page_texts(content: PdfSource) -> Iterator[str]:
+    """Text of each page with pypdf, yielded as soon as that page is parsed."""
+    import pypdf
+    with open_pdf_stream(content) as stream:
+        for page in pypdf.PdfReader(stream).pages:
+            yield page.extract_text() or ""
+
+
+def iter_pdfium_page_texts(content: PdfSource) -> Iterator[str]:
+    """Text of each page via pypdfium2, yielded page by page (no cleaning)."""
+    with closing(open_pdfium_document(content)) as pdf:
+        for i in range(len(pdf)):
+            yield pdfium_page_text(pdf, i)
+
+
+def extract_text_pdfium(content: PdfSource) -> str:
+    """Raw text of every page via pypdfium2 (no cleaning)."""
+    return "".join(page_text + "\n" for page_text in iter_pdfium_page_texts(content))
+
+
+# =================================
+# PAGE-PARALLEL EXTRACTION
+# =================================
+def pdf_page_count(content: PdfSource) -> int:
+    """Number of pages (0 if pypdf can't open the file). Reads structure only."""
+    try:
+        import pypdf
+        with open_pdf_stream(content) as stream:
+            return len(pypdf.PdfReader(stream).pages)
+    except Exception:
+        return 0
+
+
+def extract_page_range(content: PdfSource, start: int, stop: int) -> List[Optional[str]]:
+    """
+    Text of pages [start, stop) with pypdf, one entry per page.
+    A page pypdf chokes on is retried with pypdfium2; None if both fail.
+    Picklable entry point for the CPU worker pool.
+    """
+    import pypdf
+    backup = None
+    texts = []
+    try:
+        with open_pdf_stream(content) as stream:
+            reader = pypdf.PdfReader(stream)
+            for index in range(start, stop):
+                try:
+                    texts.append(reader.pages[index].extract_text() or "")
+                    continue
+                except Exception as e:
+                    print(f"⚠️ PyPDF2 failed on page {index + 1}: {e}")
+                try:
+                    if backup is None:
+                        backup = open_pdfium_document(content)
+                    texts.append(pdfium_page_text(backup, index))
+                except Exception as e:
+                    print(f"⚠️ pypdfium2 failed on page {index + 1}: {e}")
+                    texts.append(None)
+    finally:
+        if backup is not None:
+            backup.close()
+    return texts
+
+
+def submit_with_budget(executor: Executor, budget: float, fn, *args) -> Future:
+    """
+    Submit fn(*args) with a wall-clock budget. The sandbox pool enforces it by
+    killing the worker; other executors can't stop a running job, so callers
+    wait on those with result(timeout=...) and the job runs on regardless.
+    """
+    if hasattr(executor, "submit_with_timeout"):
+        return executor.submit_with_timeout(budget, fn, *args)
+    return executor.submit(fn, *args)
+
+
+def _wait_timeout(executor: Executor, deadline: float) -> Optional[float]:
+    """How long to wait on a submit_with_budget future: the sandbox times out on its own."""
+    return None if hasattr(executor, "submit_with_timeout") else max(0.0, deadline - time.monotonic())
+
+
+def map_page_ranges(fn, content: PdfSource, executor: Executor, workers: int,
+                    page_count: int, page_timeout: float) -> List[Optional[str]]:
+    """
+    Run fn(content, start, stop) over contiguous page ranges concurrently on the
+    executor and reassemble the per-page results in page order.
+    
+    A range that raises or exceeds page_timeout per page contributes None for
+    each of its pages instead of failing the document (see submit_with_budget).
+    """
+    chunk = -(-page_count // max(1, workers))
+    ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    started = time.monotonic()
+    futures = [
+        submit_with_budget(executor, page_timeout * (stop - start), fn, content, start, stop)
+        for start, stop in ranges
+    ]
+    
+    pages: List[Optional[str]] = []
+    for (start, stop), future in zip(ranges, futures):
+        try:
+            pages.extend(future.result(timeout=_wait_timeout(executor, started + page_timeout * (stop - start))))
+            continue
+        except FutureTimeoutError:
+            # Only reached off the sandbox: the range keeps its worker until it finishes
+            print(f"⏱️ Pages {start + 1}-{stop} exceeded {page_timeout * (stop - start):g}s; "
+                  f"skipping them (the worker is not stopped)")
+        except Exception as e:
+            print(f"⚠️ Pages {start + 1}-{stop} failed: {e}")
+        pages.extend([None] * (stop - start))
+    
+    failed = [index + 1 for index, page_text in enumerate(pages) if page_text is None]
+    if failed:
+        print(f"⚠️ Skipped unreadable pages: {failed}")
+    return pages
+
+
+def extract_text_parallel(content: PdfSource, executor: Executor, workers: int,
+                          page_count: int, page_timeout: float) -> Optional[str]:
+    """
+    extract_text_from_bytes for long documents: pages are extracted concurrently
+    in ranges (see map_page_ranges). If the text layer is too thin, falls back to
+    pypdfium2 for the whole file exactly like the serial path.
+    """
+    return extract_text_parallel_checked(content, executor, workers, page_count, page_timeout)[0]
+
+
+def extract_text_parallel_checked(content: PdfSource, executor: Executor, workers: int, page_count: int,
+                                  page_timeout: float) -> Tuple[Optional[str], List[Optional[str]]]:
+    """
+    extract_text_parallel that also returns the text of every page (None where a
+    range failed or timed out), for per-page quality checks.
+    """
+    pages = map_page_ranges(extract_page_range, content, executor, workers, page_count, page_timeout)
+    
+    text = "".join(page_text + "\n" for page_text in pages if page_text)
+    if len(text.strip()) > 100:
+        print(f"✅ Extracted text using PyPDF2 ({page_count} pages, {workers} workers)")
+        return _clean_text(text), pages
+    
+    try:
+        print("🔄 Attempting backup extraction with pypdfium2...")
+        budget = page_timeout * page_count
+        future = submit_with_budget(executor, budget, extract_text_pdfium, content)
+        backup = future.result(timeout=_wait_timeout(executor, time.monotonic() + budget))
+        if backup.strip():
+            return _clean_text(backup), pages
+    except Exception as e:
+        print(f"⚠️ pypdfium2 extraction failed: {e}")
+    
+    return (_clean_text(text) if text.strip() else None), pages
+
+
+def _write_pages(reader: "pypdf.PdfReader", indices) -> bytes:
+    import pypdf
+    writer = pypdf.PdfWriter()
+    for index in indices:
+        writer.add_page(reader.pages[index])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def split_pdf_range(content: PdfSource, start: int, stop: int) -> bytes:
+    """Pages [start, stop) as a standalone PDF (pypdf PdfWriter)."""
+    import pypdf
+    with open_pdf_stream(content) as stream:
+        return _write_pages(pypdf.PdfReader(stream), range(start, stop))
+
+
+def split_pdf_pages(content: PdfSource, indices: List[int]) -> List[bytes]:
+    """One standalone single-page PDF per requested page index."""
+    import pypdf
+    with open_pdf_stream(content) as stream:
+        reader = pypdf.PdfReader(stream)
+        return [_write_pages(reader, [index]) for index in indices]
+
+
+def expand_uploads(filename: str, content: bytes, max_files: int, max_bytes: int,
+                   max_total_bytes: int) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    Turn one uploaded file into batch items, unpacking zip archives of PDFs.
+    A corrupt or encrypted member only fails its own item; max_total_bytes caps
+    what all accepted items may hold in memory together.
+    
+    Returns:
+        List of (name, pdf_bytes, error); pdf_bytes is None when error is set.
+    """
+    if not zipfile.is_zipfile(io.BytesIO(content)):
+        if len(content) > max_bytes:
+            return [(filename, None, f"File exceeds {max_bytes} bytes")]
+        if len(content) > max_total_bytes:
+            return [(filename, None, "Batch exceeds its total size limit")]
+        return [(filename, content, None)]
+    
+    items = []
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except (zipfile.BadZipFile, RuntimeError, zlib.error, OSError) as e:
+        return [(filename, None, f"Unreadable zip archive: {e}")]
+    
+    with archive:
+        for member in archive.infolist():
+            name = member.filename
+            if member.is_dir() or name.startswith('__MACOSX/') or not name.lower().endswith('.pdf'):
+                continue
+            if len(items) >= max_files:
+                items.append((f"{filename}:{name}", None, f"Archive exceeds {max_files} PDFs"))
+                break
+            # Trust the declared size only as a pre-check; read() is capped too (zip bombs)
+            if member.file_size > max_bytes:
+                items.append((f"{filename}:{name}", None, f"File exceeds {max_bytes} bytes"))
+                continue
+            limit = min(max_bytes, max_total_bytes)
+            try:
+                with archive.open(member) as handle:
+                    data = handle.read(limit + 1)
+            except (zipfile.BadZipFile, RuntimeError, zlib.error, OSError) as e:
+                # Bad CRC, encrypted member, or corrupt deflate stream
+                items.append((f"{filename}:{name}", None, f"Unreadable archive member: {e}"))
+                continue
+            if len(data) > max_bytes:
+                items.append((f"{filename}:{name}", None, f"File exceeds {max_bytes} bytes"))
+                continue
+            if len(data) > max_total_bytes:
+                items.append((f"{filename}:{name}", None, "Batch exceeds its total size limit"))
+                continue
+            max_total_bytes -= len(data)
+            items.append((f"{filename}:{name}", data, None))
+    
+    if not items:
+        items.append((filename, None, "Archive contains no PDF files"))
+    return items
+
+
+def extract_skills(text):
+    """
+    Detect skills with the compiled matcher (one pass over the text).
+
+    Returns:
+        (skills, frequency) where skills are ordered by first appearance.
+    """
+    frequency = get_taxonomy().matcher.count(text)
+    detected = list(frequency)
 
     if len(detected) == 0:
-        print("⚠️ Warning: No skills detected! Check OCR quality or SKILLS_LIST.")
+        print("⚠️ Warning: No skills detected! Check OCR quality or the skill taxonomy.")
 
-    return list(detected), frequency
+    return detected, frequency